@@ -4,12 +4,20 @@
 import bz2
 import gzip
 import lzma
+import os
 import tarfile
+import threading
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 
 import py7zr
 import rarfile
 
+from ..context import InspectionTimeout, check_deadline
+from ..expansion import ExpansionScreen, expansion_finding
+from .ZipStructure import ZipStructureError, map_zip, read_zip_entries, screen_zip_entries
 from ..report import (
     TAG_CORRUPTED,
     TAG_INVALID_FORMAT,
@@ -20,24 +28,144 @@ from ..report import (
 )
 
 
-def check_zip_file(file_path, mode="deep"):
-    """Check .zip archive integrity."""
-    if not zipfile.is_zipfile(file_path):
+ZIP_READ_CHUNK = 1 << 20
+# Below this much uncompressed data, extra threads cost more than they save.
+ZIP_PARALLEL_MIN_BYTES = 16 << 20
+# Default thread cap per archive: batches already run one file per worker,
+# so cpu_count threads per file would mean cpu_count² threads and handles.
+ZIP_MAX_WORKERS = 4
+# Errors that mean a member's data is damaged, as opposed to the archive.
+_BAD_MEMBER_ERRORS = (zipfile.BadZipFile, zlib.error, lzma.LZMAError, EOFError, OSError)
+
+
+def _zip_member_is_bad(archive, info, context, progress) -> bool:
+    """Decompress one member, letting ``ZipExtFile`` verify its CRC at EOF."""
+    check_deadline(context, progress)
+    try:
+        with archive.open(info) as member:
+            while member.read(ZIP_READ_CHUNK):
+                check_deadline(context, progress)
+    except _BAD_MEMBER_ERRORS:
+        return True
+    return False
+
+
+def _bad_zip_members(
+    file_path, archive, workers=None, stop_early=True, context=None
+) -> List[str]:
+    members = archive.infolist()
+    if workers is None:
+        workers = min(ZIP_MAX_WORKERS, os.cpu_count() or 1)
+    workers = min(workers, len(members))
+    total_bytes = sum(info.file_size for info in members)
+    if workers <= 1 or total_bytes < ZIP_PARALLEL_MIN_BYTES:
+        bad = []
+        for index, info in enumerate(members):
+            progress = f"{index}/{len(members)} ZIP members checked"
+            if _zip_member_is_bad(archive, info, context, progress):
+                bad.append(info.filename)
+                if stop_early:
+                    break
+        return bad
+
+    # Largest members first so no thread is left with one huge member at the end.
+    pending = iter(sorted(range(len(members)), key=lambda i: -members[i].compress_size))
+    lock = threading.Lock()
+    stop = threading.Event()
+    bad_indexes = []
+    checked = [0]
+
+    def _worker():
+        # zipfile serializes reads on a shared handle; each thread gets its own.
+        with zipfile.ZipFile(file_path, "r") as own_archive:
+            while not stop.is_set():
+                with lock:
+                    index = next(pending, None)
+                    progress = f"{checked[0]}/{len(members)} ZIP members checked"
+                if index is None:
+                    return
+                try:
+                    is_bad = _zip_member_is_bad(own_archive, members[index], context, progress)
+                except InspectionTimeout:
+                    stop.set()
+                    raise
+                with lock:
+                    checked[0] += 1
+                    if is_bad:
+                        bad_indexes.append(index)
+                if is_bad and stop_early:
+                    stop.set()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_worker) for _ in range(workers)]
+    for future in futures:
+        future.result()
+    return [members[index].filename for index in sorted(bad_indexes)]
+
+
+def verify_zip_members(
+    file_path: str,
+    workers: Optional[int] = None,
+    stop_early: bool = True,
+    context=None,
+) -> List[str]:
+    """
+    Decompress and CRC-check the members of a ZIP; return the bad ones.
+
+    Large archives are split across ``workers`` threads (default: CPU count,
+    at most ``ZIP_MAX_WORKERS``), each reading through its own handle while
+    zlib releases the GIL. With ``stop_early`` no new member is started after
+    the first failure, so the result holds every bad member found by then;
+    without it every member is checked. Names are returned in archive order.
+    """
+    with zipfile.ZipFile(file_path, "r") as archive:
+        return _bad_zip_members(file_path, archive, workers, stop_early, context)
+
+
+def _bad_members_finding(bad_members):
+    if len(bad_members) == 1:
+        return fail_finding(
+            f"ZIP member '{bad_members[0]}' failed CRC check.",
+            TAG_CORRUPTED,
+        )
+    names = ", ".join(f"'{name}'" for name in bad_members)
+    return fail_finding(
+        f"{len(bad_members)} ZIP members failed CRC check: {names}.",
+        TAG_CORRUPTED,
+    )
+
+
+def check_zip_file(file_path, mode="deep", context=None):
+    """
+    Check .zip archive integrity.
+
+    Both modes first cross-check the end records, central directory and
+    local headers, and screen the declared sizes against the expansion
+    limits, without decompressing anything; deep mode then CRC-checks every
+    member.
+    """
+    source = context.open() if context is not None else file_path
+    if not zipfile.is_zipfile(source):
         return fail_finding(
             "ZIP signature invalid; not a standard ZIP archive.",
             TAG_INVALID_FORMAT,
         )
     try:
-        with zipfile.ZipFile(file_path, "r") as archive:
-            if mode == "fast":
-                _ = archive.namelist()
-                return ok_finding("ZIP fast check passed.")
-            corrupted_member = archive.testzip()
-            if corrupted_member:
-                return fail_finding(
-                    f"ZIP member '{corrupted_member}' failed CRC check.",
-                    TAG_CORRUPTED,
-                )
+        with map_zip(file_path, context) as data:
+            entries = read_zip_entries(data, context)
+        problem = screen_zip_entries(entries, ExpansionScreen.for_file(file_path, context))
+        if problem:
+            return expansion_finding(problem)
+        if mode == "fast":
+            return ok_finding("ZIP fast check passed.")
+        with zipfile.ZipFile(source, "r") as archive:
+            bad_members = _bad_zip_members(file_path, archive, context=context)
+            if bad_members:
+                return _bad_members_finding(bad_members)
+    except InspectionTimeout:
+        raise
+    except ZipStructureError as exc:
+        return fail_finding(f"ZIP structure corrupted: {exc}.", TAG_CORRUPTED, error=str(exc))
     except zipfile.BadZipFile as exc:
         return fail_finding(
             f"ZIP archive corrupted: {exc}",
@@ -92,12 +220,45 @@ def check_rar_file(file_path, mode="deep"):
     return ok_finding("RAR deep check passed.")
 
 
-def check_gzip_file(file_path, mode="deep"):
-    """Check .gz archive integrity."""
+# Fast mode decompresses this much of a .gz/.bz2/.xz file; deep mode all of it.
+STREAM_FAST_READ_SIZE = 1024
+STREAM_READ_CHUNK = 1 << 20
+
+
+def _read_compressed_stream(reader, mode, context, label) -> None:
+    """
+    Decompress the first KB (fast) or the whole file (deep) from ``reader``.
+
+    Deep mode reuses one ``STREAM_READ_CHUNK`` buffer, so memory stays
+    constant; the decompressor verifies every checksum it passes, and
+    reaching EOF verifies the last one.
+    """
+    if mode == "fast":
+        reader.read(STREAM_FAST_READ_SIZE)
+        return
+    view = memoryview(bytearray(STREAM_READ_CHUNK))
+    total = 0
+    while True:
+        count = reader.readinto(view)
+        if not count:
+            return
+        total += count
+        check_deadline(context, f"{total} bytes of {label} decompressed")
+
+
+def check_gzip_file(file_path, mode="deep", context=None):
+    """
+    Check .gz archive integrity.
+
+    Deep mode decompresses every member, checking each CRC32/ISIZE trailer.
+    """
+    source = context.open() if context is not None else file_path
     try:
-        with gzip.open(file_path, "rb") as gzip_file:
-            gzip_file.read(1024 if mode == "deep" else 16)
-    except (gzip.BadGzipFile, OSError, EOFError) as exc:
+        with gzip.open(source, "rb") as gzip_file:
+            _read_compressed_stream(gzip_file, mode, context, "gzip")
+    except InspectionTimeout:
+        raise
+    except (gzip.BadGzipFile, OSError, EOFError, zlib.error) as exc:
         return fail_finding(
             f"Gzip corrupted or invalid: {exc}",
             TAG_CORRUPTED,
@@ -107,11 +268,18 @@ def check_gzip_file(file_path, mode="deep"):
     return ok_finding("Gzip check passed.")
 
 
-def check_bzip2_file(file_path, mode="deep"):
-    """Check .bz2 archive integrity."""
+def check_bzip2_file(file_path, mode="deep", context=None):
+    """
+    Check .bz2 archive integrity.
+
+    Deep mode decompresses every stream, checking each block and stream CRC.
+    """
+    source = context.open() if context is not None else file_path
     try:
-        with bz2.BZ2File(file_path, "rb") as bzip_file:
-            bzip_file.read(1024 if mode == "deep" else 16)
+        with bz2.BZ2File(source, "rb") as bzip_file:
+            _read_compressed_stream(bzip_file, mode, context, "bzip2")
+    except InspectionTimeout:
+        raise
     except (OSError, EOFError) as exc:
         return fail_finding(
             f"Bzip2 corrupted or invalid: {exc}",
@@ -122,12 +290,17 @@ def check_bzip2_file(file_path, mode="deep"):
     return ok_finding("Bzip2 check passed.")
 
 
-def check_7z_file(file_path, mode="deep"):
-    """Check .7z archive integrity."""
+def check_7z_file(file_path, mode="deep", context=None):
+    """Check .7z archive integrity; declared sizes are screened before decoding."""
     try:
         with py7zr.SevenZipFile(file_path, "r") as archive:
+            screen = ExpansionScreen.for_file(file_path, context)
+            for info in archive.list():
+                # Members of a solid block share one compressed size.
+                problem = screen.add(info.filename, info.uncompressed or 0, info.compressed)
+                if problem:
+                    return expansion_finding(problem)
             if mode == "fast":
-                _ = archive.getnames()
                 return ok_finding("7z fast check passed.")
             archive.test()
     except py7zr.exceptions.Bad7zFile:
@@ -145,11 +318,19 @@ def check_7z_file(file_path, mode="deep"):
     return ok_finding("7z deep check passed.")
 
 
-def check_xz_file(file_path, mode="deep"):
-    """Check .xz integrity."""
+def check_xz_file(file_path, mode="deep", context=None):
+    """
+    Check .xz integrity.
+
+    Deep mode decompresses every stream, checking each block's integrity
+    check and the stream index.
+    """
+    source = context.open() if context is not None else file_path
     try:
-        with lzma.open(file_path, "rb") as xz_file:
-            xz_file.read(1024 if mode == "deep" else 16)
+        with lzma.open(source, "rb") as xz_file:
+            _read_compressed_stream(xz_file, mode, context, "xz")
+    except InspectionTimeout:
+        raise
     except (lzma.LZMAError, EOFError, OSError) as exc:
         return fail_finding(
             f"XZ corrupted or invalid: {exc}",
@@ -160,25 +341,93 @@ def check_xz_file(file_path, mode="deep"):
     return ok_finding("XZ check passed.")
 
 
-def check_tar_file(file_path, mode="deep"):
-    """Check .tar and its compressed variants."""
+TAR_READ_CHUNK = 1 << 20
+# Decompressors chosen by magic bytes; each verifies its own checksums at EOF,
+# which tarfile's "r|gz" stream does not.
+_TAR_DECOMPRESSORS = (
+    (b"\x1f\x8b", lambda raw: gzip.GzipFile(fileobj=raw, mode="rb")),
+    (b"BZh", bz2.BZ2File),
+    (b"\xfd7zXZ\x00", lzma.LZMAFile),
+)
+# Errors raised by a damaged tar stream or its compression layer.
+_TAR_STREAM_ERRORS = (tarfile.ReadError, EOFError, zlib.error, lzma.LZMAError, OSError)
+
+
+def _tar_is_compressed(header: bytes) -> bool:
+    return any(header.startswith(magic) for magic, _ in _TAR_DECOMPRESSORS)
+
+
+def _decompressing_reader(raw, header: bytes):
+    for magic, reader in _TAR_DECOMPRESSORS:
+        if header.startswith(magic):
+            return reader(raw)
+    return raw
+
+
+def check_tar_stream(file_path, byte_budget: Optional[int] = None, context=None):
+    """
+    Deep-check a tar (plain, gz, bz2 or xz) in one sequential pass.
+
+    The archive is decompressed exactly once, front to back, in
+    ``TAR_READ_CHUNK`` buffers: every member body is read to its declared
+    size, then the rest of the stream so the compression layer verifies its
+    checksum. Memory stays constant. With ``byte_budget`` the pass stops
+    after that many decompressed bytes and the result is marked partial.
+    """
+    if byte_budget is not None and byte_budget <= 0:
+        raise ValueError("byte_budget must be > 0")
+    budget = float("inf") if byte_budget is None else byte_budget
+    consumed = 0
+
+    def _over_budget():
+        return ok_finding(
+            f"Tar stream check stopped after the {byte_budget}-byte budget; result is partial.",
+            TAG_PARTIAL,
+        )
+
+    own_file = None
     try:
-        with tarfile.open(file_path, "r:*") as archive:
-            if mode == "fast":
-                _ = archive.getmembers()
-                return ok_finding("Tar fast check passed.")
-            for member in archive.getmembers():
-                if member.issym() or member.islnk():
+        if context is not None:
+            # ``header`` may read from the shared handle, so rewind after it.
+            header = context.header
+            raw = context.open()
+        else:
+            raw = own_file = open(file_path, "rb")
+            header = raw.read(8)
+            raw.seek(0)
+        screen = ExpansionScreen.for_file(file_path, context, _tar_is_compressed(header))
+        stream = _decompressing_reader(raw, header)
+        with tarfile.open(fileobj=stream, mode="r|", bufsize=TAR_READ_CHUNK) as archive:
+            for index, member in enumerate(archive):
+                progress = f"{index} tar members checked"
+                check_deadline(context, progress)
+                problem = screen.add(member.name, member.size)
+                if problem:
+                    return expansion_finding(problem)
+                if not member.isfile():
                     continue
-                if member.isfile():
-                    extracted = archive.extractfile(member)
-                    if extracted is None:
-                        continue
-                    try:
-                        extracted.read(128)
-                    finally:
-                        extracted.close()
-    except tarfile.ReadError as exc:
+                body = archive.extractfile(member)
+                remaining = member.size
+                while remaining:
+                    if consumed >= budget:
+                        return _over_budget()
+                    # A short body raises ReadError("unexpected end of data").
+                    chunk = body.read(min(TAR_READ_CHUNK, remaining, budget - consumed))
+                    remaining -= len(chunk)
+                    consumed += len(chunk)
+                    check_deadline(context, progress)
+        # Padding and trailing blocks: read them so gzip/bz2/xz check the stream end.
+        while stream is not raw:
+            if consumed >= budget:
+                return _over_budget()
+            chunk = stream.read(min(TAR_READ_CHUNK, budget - consumed))
+            if not chunk:
+                break
+            consumed += len(chunk)
+            check_deadline(context, "tar stream end")
+    except InspectionTimeout:
+        raise
+    except _TAR_STREAM_ERRORS as exc:
         return fail_finding(
             f"Tar archive corrupted: {exc}",
             TAG_CORRUPTED,
@@ -190,4 +439,52 @@ def check_tar_file(file_path, mode="deep"):
             TAG_IO_ERROR,
             error=str(exc),
         )
+    finally:
+        if own_file is not None:
+            own_file.close()
     return ok_finding("Tar deep check passed.")
+
+
+def check_tar_file(file_path, mode="deep", context=None):
+    """
+    Check .tar and its compressed variants.
+
+    Deep mode is ``check_tar_stream``, within the ``tar_byte_budget`` of the
+    context's expansion limits. Fast mode walks the member headers.
+    Both modes screen each header against the expansion limits before its
+    data is touched, so a hostile header stops the check at that member;
+    a plain tar is only screened for its entry count.
+    """
+    if mode != "fast":
+        limits = context.expansion_limits if context is not None else None
+        byte_budget = limits.tar_byte_budget if limits is not None else None
+        return check_tar_stream(file_path, byte_budget, context)
+    try:
+        if context is not None:
+            header = context.header
+        else:
+            with open(file_path, "rb") as handle:
+                header = handle.read(8)
+        with tarfile.open(file_path, "r:*") as archive:
+            screen = ExpansionScreen.for_file(file_path, context, _tar_is_compressed(header))
+            # Iterate lazily so the deadline is checked while members are scanned.
+            for index, member in enumerate(archive):
+                check_deadline(context, f"{index} tar members checked")
+                problem = screen.add(member.name, member.size)
+                if problem:
+                    return expansion_finding(problem)
+    except InspectionTimeout:
+        raise
+    except tarfile.ReadError as exc:
+        return fail_finding(
+            f"Tar archive corrupted: {exc}",
+            TAG_CORRUPTED,
+            error=str(exc),
+        )
+    except Exception as exc:  # pragma: no cover - IO and codec depend on environment
+        return fail_finding(
+            f"Tar check failed: {exc}",
+            TAG_IO_ERROR,
+            error=str(exc),
+        )
+    return ok_finding("Tar fast check passed.")
@@ -14,6 +14,7 @@ from ..report import (
     fail_finding,
     ok_finding,
 )
+from .ZipStructure import zip_expansion_finding
 
 
 def _fast_check_xlsx(file_path):
@@ -42,8 +43,11 @@ def _fast_check_xlsx(file_path):
     return ok_finding("XLSX fast check passed.")
 
 
-def check_excel_file(file_path, mode="deep"):
-    """Check .xlsx integrity."""
+def check_excel_file(file_path, mode="deep", context=None):
+    """Check .xlsx integrity; the container's declared sizes are screened first."""
+    finding = zip_expansion_finding(file_path, context)
+    if finding is not None:
+        return finding
     if mode == "fast":
         return _fast_check_xlsx(file_path)
     try:
@@ -1,17 +1,34 @@
 import os
-from typing import Dict, Iterable, Optional, Set
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from ..plugins import InspectorCallable, load_default_plugins
+from ..context import FileContext, InspectionTimeout
+from ..expansion import ExpansionLimits
+from ..plugins import (
+    COST_CLASS_IO,
+    InspectorCallable,
+    accepts_file_context,
+    get_cost_class,
+)
+from ..plugins.registry import LazyInspectorRegistry
 from ..report import (
     InspectionFinding,
     TAG_CORRUPTED,
     TAG_INVALID_FORMAT,
     TAG_IO_ERROR,
+    TAG_PARTIAL,
+    TAG_TIMEOUT,
     TAG_UNSUPPORTED,
     fail_finding,
+    ok_finding,
 )
+from .TailInspector import TAIL_CHECKERS, check_tail
 
-SUPPORTED_MODES = {"fast", "deep"}
+SIGNATURE_MODE = "signature"
+TAIL_MODE = "tail"
+SUPPORTED_MODES = {"fast", "deep", SIGNATURE_MODE, TAIL_MODE}
+# Modes that read only a few bytes at the head/tail and never call a plugin.
+LIGHTWEIGHT_MODES = frozenset({SIGNATURE_MODE, TAIL_MODE})
 
 
 def _normalize_extension_filter(
@@ -29,11 +46,21 @@ def _normalize_extension_filter(
 
 
 def _starts_with(*prefixes: bytes):
-    return lambda header: any(header.startswith(prefix) for prefix in prefixes)
+    def checker(header: bytes) -> bool:
+        return any(header.startswith(prefix) for prefix in prefixes)
+
+    checker.sniff_rules = tuple(((0, prefix),) for prefix in prefixes)
+    return checker
+
+
+def _matches_at(*anchors: Tuple[int, bytes]):
+    """Every ``(offset, marker)`` anchor must match."""
 
+    def checker(header: bytes) -> bool:
+        return all(header[offset : offset + len(marker)] == marker for offset, marker in anchors)
 
-def _is_mp4(header: bytes) -> bool:
-    return len(header) >= 8 and header[4:8] == b"ftyp"
+    checker.sniff_rules = (tuple(anchors),)
+    return checker
 
 
 def _is_mp3(header: bytes) -> bool:
@@ -42,15 +69,16 @@ def _is_mp3(header: bytes) -> bool:
     return len(header) >= 2 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0
 
 
+# A bare MPEG frame sync is too weak to classify unknown content by.
+_is_mp3.sniff_rules = (((0, b"ID3"),),)
+
 SIGNATURE_CHECKERS = {
     ".jpg": _starts_with(b"\xFF\xD8\xFF"),
     ".jpeg": _starts_with(b"\xFF\xD8\xFF"),
     ".png": _starts_with(b"\x89PNG\r\n\x1a\n"),
     ".gif": _starts_with(b"GIF87a", b"GIF89a"),
     ".bmp": _starts_with(b"BM"),
-    ".webp": lambda header: len(header) >= 12
-    and header[:4] == b"RIFF"
-    and header[8:12] == b"WEBP",
+    ".webp": _matches_at((0, b"RIFF"), (8, b"WEBP")),
     ".tiff": _starts_with(b"II*\x00", b"MM\x00*"),
     ".pdf": _starts_with(b"%PDF-"),
     ".zip": _starts_with(b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08"),
@@ -64,18 +92,94 @@ SIGNATURE_CHECKERS = {
     ".xz": _starts_with(b"\xFD7zXZ\x00"),
     ".tar.xz": _starts_with(b"\xFD7zXZ\x00"),
     ".mp3": _is_mp3,
-    ".mp4": _is_mp4,
+    ".mp4": _matches_at((4, b"ftyp")),
     ".flac": _starts_with(b"fLaC"),
     ".ogg": _starts_with(b"OggS"),
     ".oga": _starts_with(b"OggS"),
-    ".wav": lambda header: len(header) >= 12
-    and header[:4] == b"RIFF"
-    and header[8:12] == b"WAVE",
+    ".wav": _matches_at((0, b"RIFF"), (8, b"WAVE")),
     ".sqlite": _starts_with(b"SQLite format 3\x00"),
     ".db": _starts_with(b"SQLite format 3\x00"),
     ".msg": _starts_with(b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"),
 }
 
+# Smallest size a structurally valid file of each type can have; used by the
+# header-only "signature" mode alongside the magic-byte check.
+SIGNATURE_MIN_SIZES = {
+    ".jpg": 107,
+    ".jpeg": 107,
+    ".png": 67,
+    ".gif": 26,
+    ".bmp": 26,
+    ".webp": 26,
+    ".tiff": 8,
+    ".pdf": 20,
+    ".zip": 22,
+    ".xlsx": 22,
+    ".docx": 22,
+    ".pptx": 22,
+    ".xls": 512,
+    ".rar": 20,
+    ".7z": 32,
+    ".tar": 512,
+    ".gz": 18,
+    ".bz2": 14,
+    ".xz": 32,
+    ".mp3": 4,
+    ".mp4": 8,
+    ".flac": 42,
+    ".ogg": 27,
+    ".oga": 27,
+    ".wav": 44,
+    ".sqlite": 512,
+    ".db": 512,
+}
+
+SNIFF_HEADER_SIZE = 32
+SniffRule = Tuple[Tuple[Tuple[int, bytes], ...], str]
+
+
+def _compile_sniff_table(
+    checkers: Dict[str, Callable[[bytes], bool]],
+) -> Tuple[Dict[int, List[SniffRule]], List[SniffRule]]:
+    """
+    Index the checkers' ``sniff_rules`` by the first header byte.
+
+    Identical rules keep the first extension declared (``.jpg`` over
+    ``.jpeg``, ``.zip`` over the OOXML formats); within a bucket the most
+    specific rule is tried first. Rules not anchored at offset 0 are kept in
+    a short list that is tried after the indexed lookup.
+    """
+    by_first_byte: Dict[int, List[SniffRule]] = {}
+    unanchored: List[SniffRule] = []
+    seen = set()
+    for extension, checker in checkers.items():
+        for anchors in getattr(checker, "sniff_rules", ()):
+            anchors = tuple(sorted(anchors))
+            if anchors in seen:
+                continue
+            seen.add(anchors)
+            offset, marker = anchors[0]
+            if offset == 0:
+                by_first_byte.setdefault(marker[0], []).append((anchors, extension))
+            else:
+                unanchored.append((anchors, extension))
+    for rules in by_first_byte.values():
+        rules.sort(key=lambda rule: -sum(len(marker) for _, marker in rule[0]))
+    return by_first_byte, unanchored
+
+
+_SNIFF_BY_FIRST_BYTE, _SNIFF_UNANCHORED = _compile_sniff_table(SIGNATURE_CHECKERS)
+
+
+def sniff_extension(header: bytes) -> Optional[str]:
+    """Classify a file header; return the matching extension or ``None``."""
+    header = header[:SNIFF_HEADER_SIZE]
+    candidates = _SNIFF_BY_FIRST_BYTE.get(header[0], ()) if header else ()
+    for anchors, extension in (*candidates, *_SNIFF_UNANCHORED):
+        if all(header[offset : offset + len(marker)] == marker for offset, marker in anchors):
+            return extension
+    return None
+
 
 def _extension_candidates(file_path_lower: str) -> Iterable[str]:
     """
@@ -104,19 +208,43 @@ def normalize_mode(mode: Optional[str]) -> str:
     if mode == "precise":
         return "deep"
     if mode not in SUPPORTED_MODES:
-        raise ValueError("Unsupported mode; allowed: fast, deep")
+        raise ValueError("Unsupported mode; allowed: fast, deep, signature, tail")
     return mode
 
 
-def _build_registry() -> Dict[str, InspectorCallable]:
-    registry: Dict[str, InspectorCallable] = {}
-    load_default_plugins(registry)
-    return registry
+# Plugins register (and import their third-party dependencies) on first lookup.
+INSPECTOR_REGISTRY = LazyInspectorRegistry()
+
 
+def __getattr__(name: str):
+    # Reporting what loaded or was skipped forces every plugin to register.
+    if name == "DEFAULT_LOADED_PLUGINS":
+        INSPECTOR_REGISTRY.load_all()
+        return INSPECTOR_REGISTRY.loaded_modules
+    if name == "DEFAULT_SKIPPED_PLUGINS":
+        INSPECTOR_REGISTRY.load_all()
+        return INSPECTOR_REGISTRY.skipped_modules
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-INSPECTOR_REGISTRY = _build_registry()
-DEFAULT_LOADED_PLUGINS = load_default_plugins.last_loaded_modules
-DEFAULT_SKIPPED_PLUGINS = load_default_plugins.last_skipped_modules
+
+def warm_plugins(background: bool = False) -> Optional[threading.Thread]:
+    """
+    Register every default plugin now instead of on first lookup.
+
+    With ``background=True`` the imports run in a daemon thread, which is
+    returned so callers can ``join()`` it; lookups racing the warm-up simply
+    wait for the plugin they need.
+    """
+    if not background:
+        INSPECTOR_REGISTRY.load_all()
+        return None
+    thread = threading.Thread(
+        target=INSPECTOR_REGISTRY.load_all,
+        name="ErrorFile-warm-plugins",
+        daemon=True,
+    )
+    thread.start()
+    return thread
 
 
 def register_inspector(extension: str, inspector: InspectorCallable) -> None:
@@ -132,6 +260,22 @@ def register_plugin(registrar) -> None:
     registrar(INSPECTOR_REGISTRY)
 
 
+def resolve_cost_class(file_path: str, mode: str = "deep") -> str:
+    """Return the cost class of the inspector that would handle ``file_path``."""
+    try:
+        normalized_mode = normalize_mode(mode)
+    except ValueError:
+        return COST_CLASS_IO
+    if normalized_mode in LIGHTWEIGHT_MODES:
+        # Head/tail reads only; don't import the plugin just to ask.
+        return COST_CLASS_IO
+    for extension in _extension_candidates(file_path.lower()):
+        inspector = INSPECTOR_REGISTRY.get(extension)
+        if inspector:
+            return get_cost_class(inspector, normalized_mode)
+    return COST_CLASS_IO
+
+
 class FileInspector:
     def __init__(
         self,
@@ -140,9 +284,27 @@ class FileInspector:
         signature_precheck: bool = True,
         signature_precheck_allowlist: Optional[Iterable[str]] = None,
         signature_precheck_denylist: Optional[Iterable[str]] = None,
+        stat_result: Optional[os.stat_result] = None,
+        context: Optional[FileContext] = None,
+        content_sniffing: bool = False,
+        deadline: Optional[float] = None,
+        keep_state: bool = False,
+        expansion_limits: Optional[ExpansionLimits] = None,
     ):
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File path does not exist: {file_path}")
+        # A stat result supplied by the caller (e.g. a directory walk) already
+        # proves the file exists; otherwise the context's single stat does.
+        self._owns_context = context is None
+        self.context = context or FileContext(file_path, stat_result)
+        if deadline is not None:
+            self.context.deadline = deadline
+        if keep_state:
+            self.context.keep_state = True
+        if expansion_limits is not None:
+            self.context.expansion_limits = expansion_limits
+        try:
+            _ = self.context.stat
+        except OSError:
+            raise FileNotFoundError(f"File path does not exist: {file_path}") from None
         mode = normalize_mode(mode)
         self.file_path = file_path
         self.mode = mode
@@ -156,20 +318,136 @@ class FileInspector:
         self.signature_precheck_denylist = _normalize_extension_filter(
             signature_precheck_denylist
         )
+        self.content_sniffing = content_sniffing
+        self.declared_type: Optional[str] = None
+        self.detected_type: Optional[str] = None
 
     def inspect(self) -> InspectionFinding:
+        try:
+            return self._inspect()
+        except InspectionTimeout as exc:
+            progress = f" after {exc}" if str(exc) else ""
+            return fail_finding(
+                f"Inspection deadline exceeded{progress}; result is partial.",
+                TAG_TIMEOUT,
+                TAG_PARTIAL,
+            )
+        finally:
+            if self._owns_context:
+                self.context.close()
+
+    def _inspect(self) -> InspectionFinding:
+        sniffed_type = self._sniff_type() if self.content_sniffing else None
+        if self.mode == SIGNATURE_MODE:
+            return self._inspect_signature(sniffed_type)
+        if self.mode == TAIL_MODE:
+            return self._inspect_tail(sniffed_type)
+        if sniffed_type is not None:
+            sniffed_inspector = INSPECTOR_REGISTRY.get(sniffed_type)
+            if sniffed_inspector:
+                # The header already matched the detected type's signature.
+                return self._run(sniffed_inspector)
+
         signature_finding = self._precheck_signature()
         if signature_finding:
             return signature_finding
 
         inspector = self._resolve_inspector()
         if inspector:
-            return inspector(self.file_path, self.mode)
+            return self._run(inspector)
         return fail_finding(
             f"Unsupported file type: {self.extension}",
             TAG_UNSUPPORTED,
         )
 
+    def _run(self, inspector: InspectorCallable) -> InspectionFinding:
+        if accepts_file_context(inspector):
+            return inspector(self.file_path, self.mode, context=self.context)
+        return inspector(self.file_path, self.mode)
+
+    def _inspect_signature(self, sniffed_type: Optional[str] = None) -> InspectionFinding:
+        """
+        Header-only triage: minimum-size sanity plus the magic-byte check.
+
+        Never imports or calls the format inspector, and skips opening the
+        file entirely when the stat'ed size is already too small.
+        """
+        candidates = (sniffed_type,) if sniffed_type else self._extension_candidates
+        if not any(
+            extension in INSPECTOR_REGISTRY or extension in SIGNATURE_CHECKERS
+            for extension in candidates
+        ):
+            return fail_finding(
+                f"Unsupported file type: {self.extension}",
+                TAG_UNSUPPORTED,
+            )
+
+        min_size = next(
+            (SIGNATURE_MIN_SIZES[ext] for ext in candidates if ext in SIGNATURE_MIN_SIZES),
+            0,
+        )
+        if self.context.size < min_size:
+            return fail_finding(
+                f"File too small for {candidates[0]}: {self.context.size} bytes "
+                f"(minimum {min_size}); file may be truncated.",
+                TAG_CORRUPTED,
+                TAG_PARTIAL,
+            )
+
+        for extension in candidates:
+            checker = SIGNATURE_CHECKERS.get(extension)
+            if checker is not None:
+                mismatch = self._check_signature(extension, checker)
+                if mismatch:
+                    return mismatch
+                break
+        return ok_finding("Signature check passed.")
+
+    def _inspect_tail(self, sniffed_type: Optional[str] = None) -> InspectionFinding:
+        """Signature-mode checks plus a trailer check that reads the last few KB."""
+        signature_finding = self._inspect_signature(sniffed_type)
+        if not signature_finding.ok:
+            return signature_finding
+        candidates = (sniffed_type,) if sniffed_type else self._extension_candidates
+        extension = next(
+            (ext for ext in candidates if ext in TAIL_CHECKERS),
+            candidates[0],
+        )
+        return check_tail(self.context, extension)
+
+    def _sniff_type(self) -> Optional[str]:
+        """
+        Classify the header and return the detected type to dispatch on.
+
+        Only files whose extension has no inspector, or whose header fails
+        the declared type's signature, are rerouted; everything else keeps
+        the extension-based dispatch.
+        """
+        candidates = self._extension_candidates
+        self.declared_type = next(
+            (extension for extension in candidates if extension in INSPECTOR_REGISTRY),
+            candidates[-1] if candidates else None,
+        )
+        try:
+            header = self.context.header
+        except OSError:
+            # The signature precheck or the inspector reports the read error.
+            return None
+
+        declared_checker = next(
+            (SIGNATURE_CHECKERS[ext] for ext in candidates if ext in SIGNATURE_CHECKERS),
+            None,
+        )
+        if declared_checker is not None and declared_checker(header):
+            self.detected_type = self.declared_type
+            return None
+        self.detected_type = sniff_extension(header)
+        if self.detected_type is None or self.detected_type in candidates:
+            return None
+        if declared_checker is None and any(ext in INSPECTOR_REGISTRY for ext in candidates):
+            return None
+        return self.detected_type
+
     def _precheck_signature(self) -> Optional[InspectionFinding]:
         if not self.signature_precheck:
             return None
@@ -186,22 +464,26 @@ class FileInspector:
                 and extension in self.signature_precheck_denylist
             ):
                 return None
-            try:
-                with open(self.file_path, "rb") as file:
-                    header = file.read(32)
-            except Exception as exc:
-                return fail_finding(
-                    f"Failed to read file header: {exc}",
-                    TAG_IO_ERROR,
-                    error=str(exc),
-                )
-            if not checker(header):
-                return fail_finding(
-                    f"File signature mismatch for {extension}; file may be invalid.",
-                    TAG_INVALID_FORMAT,
-                    TAG_CORRUPTED,
-                )
-            return None
+            return self._check_signature(extension, checker)
+        return None
+
+    def _check_signature(
+        self, extension: str, checker: Callable[[bytes], bool]
+    ) -> Optional[InspectionFinding]:
+        try:
+            header = self.context.header
+        except Exception as exc:
+            return fail_finding(
+                f"Failed to read file header: {exc}",
+                TAG_IO_ERROR,
+                error=str(exc),
+            )
+        if not checker(header):
+            return fail_finding(
+                f"File signature mismatch for {extension}; file may be invalid.",
+                TAG_INVALID_FORMAT,
+                TAG_CORRUPTED,
+            )
         return None
 
     def _resolve_inspector(self) -> Optional[InspectorCallable]:
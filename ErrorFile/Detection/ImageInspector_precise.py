@@ -1,7 +1,10 @@
 # ErrorFile/Detection/ImageInspector_precise.py
 
+from typing import Optional
+
 from PIL import Image
 
+from ..context import FileContext
 from ..report import (
     TAG_CORRUPTED,
     TAG_INVALID_FORMAT,
@@ -12,19 +15,26 @@ from ..report import (
 
 
 class ImageInspector:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, context: Optional[FileContext] = None):
         self.file_path = file_path
+        self.context = context
+
+    def _source(self):
+        # A rewound shared handle avoids reopening the file for each pass.
+        if self.context is not None:
+            return self.context.open()
+        return self.file_path
 
     def check_image(self, mode: str):
         """Check image integrity in fast or deep mode."""
         try:
-            with Image.open(self.file_path) as img:
+            with Image.open(self._source()) as img:
                 img.verify()
 
             if mode == "fast":
                 return ok_finding("Image fast check passed.")
 
-            with Image.open(self.file_path) as img_load:
+            with Image.open(self._source()) as img_load:
                 img_load.load()
 
             return ok_finding("Image deep check passed.")
@@ -1,8 +1,14 @@
 # ErrorFile/Detection/PDFInspector.py
 
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
 import PyPDF2
 from PyPDF2.errors import PdfReadError
 
+from ..context import FileContext, InspectionTimeout, check_deadline
 from ..report import (
     TAG_CORRUPTED,
     TAG_ENCRYPTED,
@@ -13,14 +19,82 @@ from ..report import (
 )
 
 
+PDF_STATE_KIND = "pdf-reader"
+
+
+class _PdfDeviationRecorder(logging.Handler):
+    """
+    Collect PyPDF2's robustness warnings per thread.
+
+    Non-strict parsing logs a warning wherever strict parsing would raise, so
+    a fast parse that logged nothing would have parsed the same strictly.
+    """
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self._local = threading.local()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        messages = getattr(self._local, "messages", None)
+        if messages is not None:
+            messages.append(record.getMessage())
+
+    @contextmanager
+    def recording(self):
+        self._local.messages = messages = []
+        try:
+            yield messages
+        finally:
+            self._local.messages = None
+
+
+_DEVIATIONS = _PdfDeviationRecorder()
+logging.getLogger("PyPDF2").addHandler(_DEVIATIONS)
+
+
+class _PdfState:
+    """A fast-stage reader plus the handle it reads from, for the deep stage."""
+
+    def __init__(self, reader: PyPDF2.PdfReader, file):
+        self.reader = reader
+        self.file = file
+
+    def close(self) -> None:
+        self.file.close()
+
+
 class PDFInspector:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, context: Optional[FileContext] = None):
         self.file_path = file_path
+        self.context = context
+
+    def _open(self):
+        # Reuse the context's handle (and its prefetched header) when given.
+        if self.context is not None:
+            return nullcontext(self.context.open())
+        return open(self.file_path, "rb")
+
+    def _keeps_state(self) -> bool:
+        # Without WARNING records deviations cannot be seen, so never reuse.
+        return (
+            self.context is not None
+            and self.context.keep_state
+            and logging.getLogger("PyPDF2").isEnabledFor(logging.WARNING)
+        )
 
     def _fast_check(self):
+        # A reader kept for the deep stage needs a handle that outlives this
+        # inspection; once stashed, the state owns and closes it.
+        own_file = None
         try:
-            with open(self.file_path, "rb") as file:
-                header = file.read(5)
+            if self._keeps_state():
+                own_file = open(self.file_path, "rb")
+            opened = self._open() if own_file is None else nullcontext(own_file)
+            with opened as file, _DEVIATIONS.recording() as deviations:
+                if self.context is not None:
+                    header = self.context.header[:5]
+                else:
+                    header = file.read(5)
                 if header != b"%PDF-":
                     return fail_finding(
                         "PDF header invalid.",
@@ -38,6 +112,10 @@ class PDFInspector:
                         "PDF has no pages; file may be corrupted.",
                         TAG_CORRUPTED,
                     )
+                # Only resume when strict parsing could not have differed.
+                if own_file is not None and not deviations and not reader.xref_index:
+                    self.context.stash_state(PDF_STATE_KIND, _PdfState(reader, own_file))
+                    own_file = None
 
             return ok_finding("PDF fast check passed.")
         except PdfReadError as exc:
@@ -52,11 +130,30 @@ class PDFInspector:
                 TAG_IO_ERROR,
                 error=str(exc),
             )
+        finally:
+            if own_file is not None:
+                own_file.close()
+
+    def _resume_reader(self):
+        """The fast stage's reader switched to strict mode, or ``None``."""
+        if self.context is None:
+            return None
+        state = self.context.resume_state(PDF_STATE_KIND)
+        if state is None:
+            return None
+        # Later object reads (pages, contents) now fail like a strict parse.
+        state.reader.strict = True
+        return state
 
     def _deep_check(self):
+        state = self._resume_reader()
         try:
-            with open(self.file_path, "rb") as file:
-                reader = PyPDF2.PdfReader(file, strict=True)
+            opened = self._open() if state is None else nullcontext(state)
+            with opened as file:
+                if state is None:
+                    reader = PyPDF2.PdfReader(file, strict=True)
+                else:
+                    reader = state.reader
 
                 if reader.is_encrypted:
                     return fail_finding(
@@ -70,9 +167,13 @@ class PDFInspector:
                         TAG_CORRUPTED,
                     )
 
-                for page in reader.pages:
+                page_count = len(reader.pages)
+                for index, page in enumerate(reader.pages):
+                    check_deadline(self.context, f"{index}/{page_count} PDF pages checked")
                     page.get_contents()
 
+        except InspectionTimeout:
+            raise
         except PdfReadError as exc:
             lowered = str(exc).lower()
             if "encrypted" in lowered or "password" in lowered:
@@ -103,6 +204,9 @@ class PDFInspector:
                 TAG_IO_ERROR,
                 error=str(exc),
             )
+        finally:
+            if state is not None:
+                state.close()
 
         return ok_finding("PDF deep check passed.")
 
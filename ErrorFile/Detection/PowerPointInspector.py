@@ -13,6 +13,7 @@ from ..report import (
     fail_finding,
     ok_finding,
 )
+from .ZipStructure import zip_expansion_finding
 
 
 def _fast_check_pptx(file_path):
@@ -41,8 +42,11 @@ def _fast_check_pptx(file_path):
     return ok_finding("PPTX fast check passed.")
 
 
-def check_pptx_file(file_path, mode="deep"):
-    """Check .pptx integrity."""
+def check_pptx_file(file_path, mode="deep", context=None):
+    """Check .pptx integrity; the container's declared sizes are screened first."""
+    finding = zip_expansion_finding(file_path, context)
+    if finding is not None:
+        return finding
     if mode == "fast":
         return _fast_check_pptx(file_path)
     try:
@@ -0,0 +1,219 @@
+# ErrorFile/Detection/TailInspector.py
+"""Truncation checks that only read the last few KB of a file."""
+
+import re
+import struct
+from typing import Callable, Dict, Optional
+
+from ..context import FileContext
+from ..report import (
+    InspectionFinding,
+    TAG_CORRUPTED,
+    TAG_IO_ERROR,
+    TAG_PARTIAL,
+    fail_finding,
+    ok_finding,
+)
+
+TAIL_READ_SIZE = 4096
+# EOCD (22 bytes) may be followed by a comment of up to 65535 bytes.
+ZIP_EOCD_MAX_SEARCH = 22 + 0xFFFF
+# Deflate cannot expand data by more than ~1032:1.
+GZIP_MAX_RATIO = 1032
+OGG_MAX_PAGE_SIZE = 65307
+
+_PDF_STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF")
+
+TailChecker = Callable[[FileContext], Optional[str]]
+
+
+def _tail(context: FileContext, size: int = TAIL_READ_SIZE) -> bytes:
+    size = min(size, context.size)
+    return context.read_at(context.size - size, size)
+
+
+def _check_jpeg_tail(context: FileContext) -> Optional[str]:
+    # Entropy-coded data stuffs 0xFF with 0x00, so FFD9 only appears as EOI.
+    if b"\xff\xd9" not in _tail(context):
+        return "JPEG end-of-image marker (FFD9) missing"
+    return None
+
+
+def _check_png_tail(context: FileContext) -> Optional[str]:
+    if b"IEND\xaeB`\x82" not in _tail(context):
+        return "PNG IEND chunk missing"
+    return None
+
+
+def _check_gif_tail(context: FileContext) -> Optional[str]:
+    if not _tail(context, 64).rstrip(b"\x00").endswith(b";"):
+        return "GIF trailer (0x3B) missing"
+    return None
+
+
+def _check_pdf_tail(context: FileContext) -> Optional[str]:
+    # The spec puts %%EOF within the last 1024 bytes.
+    tail = _tail(context, 1024)
+    if b"%%EOF" not in tail:
+        return "PDF %%EOF marker missing"
+    matches = _PDF_STARTXREF.findall(tail)
+    if not matches:
+        return "PDF startxref missing"
+    if int(matches[-1]) >= context.size:
+        return "PDF startxref points past the end of the file"
+    return None
+
+
+def _find_zip_eocd(context: FileContext):
+    for search_size in (TAIL_READ_SIZE, ZIP_EOCD_MAX_SEARCH):
+        tail = _tail(context, search_size)
+        position = tail.rfind(b"PK\x05\x06")
+        if position >= 0 and len(tail) - position >= 22:
+            return tail[position : position + 22], context.size - len(tail) + position
+        if len(tail) >= context.size:
+            break
+    return None, None
+
+
+def _check_zip_tail(context: FileContext) -> Optional[str]:
+    record, eocd_offset = _find_zip_eocd(context)
+    if record is None:
+        return "ZIP end of central directory record missing"
+    cd_size, cd_offset = struct.unpack("<II", record[12:20])
+    if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+        # ZIP64: the real values live in the ZIP64 EOCD record.
+        return None
+    if cd_offset + cd_size > eocd_offset:
+        return "ZIP central directory extends past the end record"
+    return None
+
+
+def _check_gzip_tail(context: FileContext) -> Optional[str]:
+    # The trailer is CRC32 + ISIZE (uncompressed size mod 2**32) of the last
+    # member; without decompressing only its plausibility can be checked.
+    if context.size < 18:
+        return "gzip trailer missing"
+    (isize,) = struct.unpack("<I", _tail(context, 4))
+    ratio_limit = context.size * GZIP_MAX_RATIO
+    if ratio_limit < 2**32 and isize > ratio_limit:
+        return f"gzip trailer size {isize} is implausible for a {context.size}-byte file"
+    return None
+
+
+def _check_xz_tail(context: FileContext) -> Optional[str]:
+    # Stream padding is zero bytes in multiples of four.
+    if not _tail(context, 64).rstrip(b"\x00").endswith(b"YZ"):
+        return "xz stream footer magic (YZ) missing"
+    return None
+
+
+def _check_7z_tail(context: FileContext) -> Optional[str]:
+    header = context.read_at(0, 32)
+    if len(header) < 32:
+        return "7z signature header truncated"
+    next_offset, next_size = struct.unpack("<QQ", header[12:28])
+    if 32 + next_offset + next_size > context.size:
+        return "7z end header lies past the end of the file"
+    return None
+
+
+def _check_tar_tail(context: FileContext) -> Optional[str]:
+    if context.size % 512:
+        return "tar size is not a multiple of 512 bytes"
+    if _tail(context, 1024).strip(b"\x00"):
+        return "tar end-of-archive zero blocks missing"
+    return None
+
+
+def _check_sqlite_tail(context: FileContext) -> Optional[str]:
+    header = context.read_at(0, 100)
+    if len(header) < 100:
+        return "SQLite header truncated"
+    (page_size,) = struct.unpack(">H", header[16:18])
+    page_size = 65536 if page_size == 1 else page_size
+    if page_size < 512:
+        return "SQLite page size invalid"
+    if context.size % page_size:
+        return "SQLite file size is not a whole number of pages"
+    change_counter, page_count = struct.unpack(">II", header[24:32])
+    (version_valid_for,) = struct.unpack(">I", header[92:96])
+    # The in-header page count is only trustworthy when both counters agree.
+    if version_valid_for == change_counter and page_count * page_size > context.size:
+        return f"SQLite header declares {page_count} pages but the file is shorter"
+    return None
+
+
+def _check_ogg_tail(context: FileContext) -> Optional[str]:
+    # Pages are at most 65307 bytes; widen the window only when needed.
+    for search_size in (TAIL_READ_SIZE, OGG_MAX_PAGE_SIZE):
+        tail = _tail(context, search_size)
+        position = tail.rfind(b"OggS")
+        if position >= 0 and len(tail) - position >= 27:
+            break
+        if len(tail) >= context.size:
+            return "Ogg final page missing"
+    else:
+        return "Ogg final page missing"
+    page = tail[position:]
+    segment_count = page[26]
+    segments = page[27 : 27 + segment_count]
+    if len(segments) < segment_count:
+        return "Ogg final page header is cut off"
+    if 27 + segment_count + sum(segments) > len(page):
+        return "Ogg final page is incomplete"
+    if not page[5] & 0x04:
+        return "Ogg last page is not flagged end-of-stream"
+    return None
+
+
+def _check_wav_tail(context: FileContext) -> Optional[str]:
+    (riff_size,) = struct.unpack("<I", context.read_at(4, 4))
+    if riff_size + 8 > context.size:
+        return "WAV RIFF size exceeds the file size"
+    return None
+
+
+TAIL_CHECKERS: Dict[str, TailChecker] = {
+    ".jpg": _check_jpeg_tail,
+    ".jpeg": _check_jpeg_tail,
+    ".png": _check_png_tail,
+    ".gif": _check_gif_tail,
+    ".pdf": _check_pdf_tail,
+    ".zip": _check_zip_tail,
+    ".xlsx": _check_zip_tail,
+    ".docx": _check_zip_tail,
+    ".pptx": _check_zip_tail,
+    ".7z": _check_7z_tail,
+    ".tar": _check_tar_tail,
+    ".tar.gz": _check_gzip_tail,
+    ".tar.xz": _check_xz_tail,
+    ".gz": _check_gzip_tail,
+    ".xz": _check_xz_tail,
+    ".sqlite": _check_sqlite_tail,
+    ".db": _check_sqlite_tail,
+    ".ogg": _check_ogg_tail,
+    ".oga": _check_ogg_tail,
+    ".wav": _check_wav_tail,
+}
+
+
+def check_tail(context: FileContext, extension: str) -> InspectionFinding:
+    """Run the tail checker registered for ``extension``."""
+    checker = TAIL_CHECKERS.get(extension)
+    if checker is None:
+        return ok_finding(f"No tail check for {extension}; signature check passed.")
+    try:
+        problem = checker(context)
+    except OSError as exc:
+        return fail_finding(
+            f"Tail read failed: {exc}",
+            TAG_IO_ERROR,
+            error=str(exc),
+        )
+    if problem:
+        return fail_finding(
+            f"{problem}; file may be truncated.",
+            TAG_CORRUPTED,
+            TAG_PARTIAL,
+        )
+    return ok_finding("Tail check passed.")
@@ -11,13 +11,20 @@ from importlib.util import find_spec
 import xml.etree.ElementTree as ET
 from html.parser import HTMLParser
 
+from ..context import check_deadline
 from ..report import TAG_INVALID_FORMAT, TAG_IO_ERROR, fail_finding, ok_finding
 
 
-def _read_text_content(file_path, max_bytes=262144):
+def _read_prefix(file_path, size, context=None):
+    if context is not None:
+        return context.read_at(0, size)
+    with open(file_path, "rb") as raw_file:
+        return raw_file.read(size)
+
+
+def _read_text_content(file_path, max_bytes=262144, context=None):
     try:
-        with open(file_path, "rb") as raw_file:
-            payload = raw_file.read(max_bytes)
+        payload = _read_prefix(file_path, max_bytes, context)
     except IOError as exc:
         return None, fail_finding(
             f"Failed to read text file: {exc}",
@@ -80,9 +87,9 @@ def check_xml_file(file_path, mode="deep"):
     return ok_finding("XML check passed.")
 
 
-def check_plain_text_file(file_path, mode="deep"):
+def check_plain_text_file(file_path, mode="deep", context=None):
     """Check .txt/.md/.log basic readability."""
-    _, finding = _read_text_content(file_path)
+    _, finding = _read_text_content(file_path, context=context)
     if finding:
         return finding
     return ok_finding("Plain text check passed.")
@@ -121,9 +128,9 @@ class _TagCounter(HTMLParser):
         self.tag_count += 1
 
 
-def check_html_file(file_path, mode="deep"):
+def check_html_file(file_path, mode="deep", context=None):
     """Check .html/.htm parseability."""
-    content, finding = _read_text_content(file_path)
+    content, finding = _read_text_content(file_path, context=context)
     if finding:
         return finding
 
@@ -225,11 +232,10 @@ def check_tsv_file(file_path, mode="deep"):
     return ok_finding("TSV check passed.")
 
 
-def check_rtf_file(file_path, mode="deep"):
+def check_rtf_file(file_path, mode="deep", context=None):
     """Check .rtf header validity."""
     try:
-        with open(file_path, "rb") as rtf_file:
-            header = rtf_file.read(5)
+        header = _read_prefix(file_path, 5, context)
     except IOError as exc:
         return fail_finding(
             f"Failed to read RTF file: {exc}",
@@ -244,11 +250,14 @@ def check_rtf_file(file_path, mode="deep"):
     return ok_finding("RTF check passed.")
 
 
-def check_eml_file(file_path, mode="deep"):
+def check_eml_file(file_path, mode="deep", context=None):
     """Check .eml parseability."""
     try:
-        with open(file_path, "rb") as eml_file:
-            content = eml_file.read()
+        if context is not None:
+            content = context.open().read()
+        else:
+            with open(file_path, "rb") as eml_file:
+                content = eml_file.read()
     except IOError as exc:
         return fail_finding(
             f"Failed to read EML file: {exc}",
@@ -271,9 +280,9 @@ def check_eml_file(file_path, mode="deep"):
     return ok_finding("EML check passed.")
 
 
-def check_toml_file(file_path, mode="deep"):
+def check_toml_file(file_path, mode="deep", context=None):
     """Check .toml syntax validity."""
-    content, finding = _read_text_content(file_path)
+    content, finding = _read_text_content(file_path, context=context)
     if finding:
         return finding
     parser = None
@@ -311,9 +320,9 @@ def check_toml_file(file_path, mode="deep"):
     )
 
 
-def check_yaml_file(file_path, mode="deep"):
+def check_yaml_file(file_path, mode="deep", context=None):
     """Check .yaml/.yml syntax validity."""
-    content, finding = _read_text_content(file_path)
+    content, finding = _read_text_content(file_path, context=context)
     if finding:
         return finding
 
@@ -349,12 +358,11 @@ def check_yaml_file(file_path, mode="deep"):
     return ok_finding("YAML basic check passed.")
 
 
-def check_msg_file(file_path, mode="deep"):
+def check_msg_file(file_path, mode="deep", context=None):
     """Check .msg (OLE Compound File) header validity."""
     ole_signature = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
     try:
-        with open(file_path, "rb") as msg_file:
-            header = msg_file.read(8)
+        header = _read_prefix(file_path, 8, context)
     except IOError as exc:
         return fail_finding(
             f"Failed to read MSG file: {exc}",
@@ -369,12 +377,14 @@ def check_msg_file(file_path, mode="deep"):
     return ok_finding("MSG header check passed.")
 
 
-def check_sqlite_file(file_path, mode="deep"):
+SQLITE_PROGRESS_OPS = 10000
+
+
+def check_sqlite_file(file_path, mode="deep", context=None):
     """Check .sqlite/.db database integrity."""
     signature = b"SQLite format 3\x00"
     try:
-        with open(file_path, "rb") as db_file:
-            header = db_file.read(16)
+        header = _read_prefix(file_path, 16, context)
     except IOError as exc:
         return fail_finding(
             f"Failed to read SQLite file: {exc}",
@@ -389,9 +399,13 @@ def check_sqlite_file(file_path, mode="deep"):
 
     try:
         with sqlite3.connect(file_path) as conn:
+            if context is not None and context.deadline is not None:
+                # A truthy return from the handler interrupts the statement.
+                conn.set_progress_handler(context.expired, SQLITE_PROGRESS_OPS)
             pragma = "PRAGMA quick_check;" if mode == "fast" else "PRAGMA integrity_check;"
             row = conn.execute(pragma).fetchone()
     except sqlite3.DatabaseError as exc:
+        check_deadline(context, "an interrupted SQLite integrity check")
         return fail_finding(
             f"SQLite check failed: {exc}",
             TAG_INVALID_FORMAT,
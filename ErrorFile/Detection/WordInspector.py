@@ -12,6 +12,7 @@ from ..report import (
     fail_finding,
     ok_finding,
 )
+from .ZipStructure import zip_expansion_finding
 
 
 def _fast_check_docx(file_path):
@@ -40,8 +41,11 @@ def _fast_check_docx(file_path):
     return ok_finding("DOCX fast check passed.")
 
 
-def check_docx_file(file_path, mode="deep"):
-    """Check .docx integrity."""
+def check_docx_file(file_path, mode="deep", context=None):
+    """Check .docx integrity; the container's declared sizes are screened first."""
+    finding = zip_expansion_finding(file_path, context)
+    if finding is not None:
+        return finding
     if mode == "fast":
         return _fast_check_docx(file_path)
     try:
@@ -0,0 +1,237 @@
+# ErrorFile/Detection/ZipStructure.py
+"""ZIP structure checks that read only record headers, never member data."""
+
+import mmap
+import struct
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from ..context import FileContext, check_deadline
+from ..expansion import ExpansionScreen, expansion_finding
+from ..report import InspectionFinding
+
+# EOCD (22 bytes) may be followed by a comment of up to 65535 bytes.
+EOCD_SIZE = 22
+EOCD_MAX_SEARCH = EOCD_SIZE + 0xFFFF
+ZIP64_LOCATOR_SIZE = 20
+ZIP64_EOCD_SIZE = 56
+CENTRAL_HEADER_SIZE = 46
+LOCAL_HEADER_SIZE = 30
+# Check the deadline every this many central directory entries.
+DEADLINE_STRIDE = 1024
+
+_EOCD = struct.Struct("<4s4H2LH")
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_EXTRA_HEADER = struct.Struct("<2H")
+
+_EOCD_SIGNATURE = b"PK\x05\x06"
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+_CENTRAL_SIGNATURE = b"PK\x01\x02"
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+_ZIP64_EXTRA_ID = 0x0001
+
+
+class ZipStructureError(ValueError):
+    """The end records, central directory or local headers are inconsistent."""
+
+
+class ZipEntry(NamedTuple):
+    name: str
+    # Absolute offsets in the file, prepended data included.
+    local_offset: int
+    data_end: int
+    compress_size: int
+    file_size: int
+
+
+def _end_records(data) -> Tuple[int, int, int, int]:
+    """Return ``(entry count, cd size, cd offset, end of cd)`` from the end records."""
+    size = len(data)
+    search_start = max(0, size - EOCD_MAX_SEARCH)
+    eocd_offset = data.rfind(_EOCD_SIGNATURE, search_start)
+    while eocd_offset >= 0 and eocd_offset + EOCD_SIZE > size:
+        eocd_offset = data.rfind(_EOCD_SIGNATURE, search_start, eocd_offset)
+    if eocd_offset < 0:
+        raise ZipStructureError("end of central directory record missing")
+    (_, disk, cd_disk, _, entries, cd_size, cd_offset, _) = _EOCD.unpack_from(data, eocd_offset)
+    if disk or cd_disk:
+        raise ZipStructureError("archives spanning multiple disks are not supported")
+    cd_end = eocd_offset
+
+    locator_offset = eocd_offset - ZIP64_LOCATOR_SIZE
+    has_locator = data[max(locator_offset, 0) : locator_offset + 4] == _ZIP64_LOCATOR_SIGNATURE
+    if locator_offset >= 0 and has_locator:
+        _, _, zip64_offset, _ = _ZIP64_LOCATOR.unpack_from(data, locator_offset)
+        # The locator's offset ignores data prepended to the archive, so find
+        # the ZIP64 record right before the locator instead.
+        record_offset = locator_offset - ZIP64_EOCD_SIZE
+        if record_offset < 0 or data[record_offset : record_offset + 4] != _ZIP64_EOCD_SIGNATURE:
+            raise ZipStructureError(
+                f"ZIP64 end of central directory record missing (expected at {zip64_offset})"
+            )
+        fields = _ZIP64_EOCD.unpack_from(data, record_offset)
+        entries, cd_size, cd_offset = fields[7], fields[8], fields[9]
+        cd_end = record_offset
+    elif 0xFFFF in (entries,) or 0xFFFFFFFF in (cd_size, cd_offset):
+        raise ZipStructureError("ZIP64 end of central directory locator missing")
+    return entries, cd_size, cd_offset, cd_end
+
+
+def _zip64_sizes(extra, file_size: int, compress_size: int, header_offset: int):
+    """Replace 0xFFFFFFFF placeholders with the values from the ZIP64 extra field."""
+    position = 0
+    while position + _EXTRA_HEADER.size <= len(extra):
+        header_id, length = _EXTRA_HEADER.unpack_from(extra, position)
+        position += _EXTRA_HEADER.size
+        if header_id == _ZIP64_EXTRA_ID:
+            # Only the placeholder fields are present, in this order.
+            values = []
+            consumed = 0
+            for field in (file_size, compress_size, header_offset):
+                if field != 0xFFFFFFFF:
+                    values.append(field)
+                    continue
+                if (consumed + 1) * 8 > length:
+                    raise ZipStructureError("ZIP64 extra field too short")
+                values.append(struct.unpack_from("<Q", extra, position + consumed * 8)[0])
+                consumed += 1
+            return tuple(values)
+        position += length
+    if 0xFFFFFFFF in (file_size, compress_size, header_offset):
+        raise ZipStructureError("ZIP64 extra field missing")
+    return file_size, compress_size, header_offset
+
+
+def read_zip_entries(data, context: Optional[FileContext] = None) -> List[ZipEntry]:
+    """
+    Walk the central directory of ``data`` and cross-check every local header.
+
+    ``data`` holds the whole file as ``bytes`` or an ``mmap`` (as from
+    ``FileContext.mmap()``, which avoids reading it). EOCD and ZIP64 records
+    are parsed, and each local header is checked for its signature, a name
+    matching the directory and compressed data ending before the directory.
+    Only header bytes are touched, so the cost grows with the member count,
+    not the archive size. Raises ``ZipStructureError`` on the first problem.
+    """
+    try:
+        return _read_entries(data, context)
+    except struct.error:
+        raise ZipStructureError("record truncated") from None
+
+
+def _read_entries(data, context) -> List[ZipEntry]:
+    entries, cd_size, cd_offset, cd_end = _end_records(data)
+    cd_start = cd_end - cd_size
+    if cd_start < 0:
+        raise ZipStructureError("central directory extends before the start of the file")
+    # Bytes prepended to the archive (self-extractors) shift every offset.
+    shift = cd_start - cd_offset
+    if shift < 0:
+        raise ZipStructureError("central directory extends past the end record")
+
+    result = []
+    position = cd_start
+    for index in range(entries):
+        if index % DEADLINE_STRIDE == 0:
+            check_deadline(context, f"{index}/{entries} ZIP headers checked")
+        if position + CENTRAL_HEADER_SIZE > cd_end:
+            raise ZipStructureError(f"central directory holds {index} of {entries} entries")
+        fields = _CENTRAL_HEADER.unpack_from(data, position)
+        if fields[0] != _CENTRAL_SIGNATURE:
+            raise ZipStructureError(f"central directory entry {index} has a bad signature")
+        compress_size, file_size = fields[8], fields[9]
+        name_length, extra_length, comment_length = fields[10], fields[11], fields[12]
+        header_offset = fields[16]
+        name_start = position + CENTRAL_HEADER_SIZE
+        extra_start = name_start + name_length
+        position = extra_start + extra_length + comment_length
+        if position > cd_end:
+            raise ZipStructureError(f"central directory entry {index} extends past the directory")
+        name = bytes(data[name_start:extra_start])
+        label = name.decode("utf-8", "replace")
+        file_size, compress_size, header_offset = _zip64_sizes(
+            data[extra_start : extra_start + extra_length], file_size, compress_size, header_offset
+        )
+
+        local_offset = header_offset + shift
+        if local_offset + LOCAL_HEADER_SIZE > cd_start:
+            raise ZipStructureError(f"local header of '{label}' points past the member data area")
+        local = _LOCAL_HEADER.unpack_from(data, local_offset)
+        if local[0] != _LOCAL_SIGNATURE:
+            raise ZipStructureError(f"local header of '{label}' has a bad signature")
+        local_name_start = local_offset + LOCAL_HEADER_SIZE
+        local_name_length, local_extra_length = local[9], local[10]
+        if data[local_name_start : local_name_start + local_name_length] != name:
+            raise ZipStructureError(
+                f"local header name of '{label}' does not match the central directory"
+            )
+        data_end = local_name_start + local_name_length + local_extra_length + compress_size
+        if data_end > cd_start:
+            raise ZipStructureError(f"data of '{label}' extends past the member data area")
+        result.append(ZipEntry(label, local_offset, data_end, compress_size, file_size))
+    if position != cd_end:
+        raise ZipStructureError(f"central directory size does not match its {entries} entries")
+    return result
+
+
+def check_zip_structure(data, context: Optional[FileContext] = None) -> Optional[str]:
+    """``read_zip_entries`` as a check: the first problem found, or ``None``."""
+    try:
+        read_zip_entries(data, context)
+    except ZipStructureError as problem:
+        return str(problem)
+    return None
+
+
+def count_overlapping_entries(entries: Sequence[ZipEntry]) -> int:
+    """Entries whose local header starts inside an earlier entry's data."""
+    overlapping = 0
+    furthest_end = 0
+    for entry in sorted(entries, key=lambda entry: entry.local_offset):
+        if entry.local_offset < furthest_end:
+            overlapping += 1
+        furthest_end = max(furthest_end, entry.data_end)
+    return overlapping
+
+
+def screen_zip_entries(entries: Sequence[ZipEntry], screen: ExpansionScreen) -> Optional[str]:
+    """Declared sizes, ratios and overlaps of ``entries`` against ``screen``'s limits."""
+    for entry in entries:
+        problem = screen.add(entry.name, entry.file_size, entry.compress_size)
+        if problem:
+            return problem
+    return screen.check_overlaps(count_overlapping_entries(entries))
+
+
+@contextmanager
+def map_zip(file_path: str, context: Optional[FileContext] = None) -> Iterator[mmap.mmap]:
+    """The context's memory map, or one of our own closed on exit."""
+    if context is not None:
+        yield context.mmap()
+        return
+    with open(file_path, "rb") as handle:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def zip_expansion_finding(
+    file_path: str, context: Optional[FileContext] = None
+) -> Optional[InspectionFinding]:
+    """
+    Expansion screening for ZIP-based containers such as OOXML documents.
+
+    Returns a failing finding when the central directory declares more than
+    the context's ``ExpansionLimits`` allow, else ``None``. Archives whose
+    headers cannot be walked are left to the format's own parser.
+    """
+    try:
+        with map_zip(file_path, context) as data:
+            entries = read_zip_entries(data, context)
+    except (ValueError, OSError):
+        return None
+    problem = screen_zip_entries(entries, ExpansionScreen.for_file(file_path, context))
+    return expansion_finding(problem) if problem else None
@@ -1,17 +1,44 @@
 import os
 import time
-from typing import Iterable, Optional, Tuple
+from contextlib import ExitStack, contextmanager
+from dataclasses import astuple, replace
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
-from .cache import InspectionCache
-from .Detection.FileInspector import FileInspector, normalize_mode
+from .aio import ainspect_file_report, ainspect_files, aiter_inspect_files
+from .cache import InspectionCache, PersistentInspectionCache
+from .Detection.FileInspector import (
+    LIGHTWEIGHT_MODES,
+    SIGNATURE_MODE,
+    TAIL_MODE,
+    FileInspector,
+    _extension_candidates,
+    normalize_mode,
+    resolve_cost_class,
+    warm_plugins,
+)
+from .cost import CostEstimator, estimate_inspection_cost
+from .expansion import DEFAULT_EXPANSION_LIMITS, ExpansionLimits
+from .fingerprint import FINGERPRINT_FULL, SUPPORTED_FINGERPRINT_STRATEGIES, file_fingerprint
+from .pipeline import normalize_stage_plans, run_pipeline, stage_plan_for, with_first_stage
+from .plugins import COST_CLASS_CPU
+from .pool import InspectionPool
+from .sandbox import SandboxLimits
 from .report import (
     InspectionReport,
     TAG_INVALID_MODE,
     TAG_NOT_FOUND,
+    TAG_PARTIAL,
+    TAG_RESOURCE_LIMIT,
+    TAG_TIMEOUT,
     TAG_UNKNOWN_ERROR,
 )
+from .scanner import iter_tree_entries
 
 DEFAULT_CACHE = InspectionCache()
+# Process-pool batches group small files into one worker call to amortize
+# pickling/IPC overhead; files at or above the byte budget are sent alone.
+DEFAULT_CHUNK_MAX_FILES = 64
+DEFAULT_CHUNK_MAX_BYTES = 1024 * 1024
 DEFAULT_STAGED_FAST_EXTENSIONS = (
     ".pdf",
     ".xlsx",
@@ -38,6 +65,22 @@ DEFAULT_STAGED_FAST_EXTENSIONS = (
     ".db",
     ".msg",
 )
+# Formats gated by the tail stage when staged_gate="tail": only those whose tail
+# check fails just where the deep check would. Marker searches (JPEG EOI, PNG
+# IEND, PDF %%EOF) and size checks (tar, SQLite, xz) also reject files with
+# trailing data, which the deep check accepts, so they go straight to deep.
+DEFAULT_STAGED_TAIL_EXTENSIONS = (
+    ".zip",
+    ".xlsx",
+    ".docx",
+    ".pptx",
+    ".7z",
+    ".gz",
+    ".tar.gz",
+)
+STAGED_GATE_MODES = ("fast", TAIL_MODE, SIGNATURE_MODE)
+# Cached reports of these modes answer a lookup for the key mode, OK or not.
+MODE_DOMINANCE = {"fast": ("deep",)}
 
 
 def inspect_file_report(
@@ -48,7 +91,34 @@ def inspect_file_report(
     signature_precheck: bool = True,
     signature_precheck_allowlist: Optional[Iterable[str]] = None,
     signature_precheck_denylist: Optional[Iterable[str]] = None,
+    stat_result: Optional[os.stat_result] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    keep_state: bool = False,
+    expansion_limits: Optional[ExpansionLimits] = None,
 ) -> InspectionReport:
+    """
+    Inspect one file and return a structured report.
+
+    With ``content_sniffing`` the file header is classified as well: files
+    without a registered extension, or whose header fails the declared type's
+    signature, are inspected as the detected type. The report's
+    ``declared_type``/``detected_type`` show what was found.
+
+    ``timeout`` (seconds) bounds the inspection itself. Archive member, PDF
+    page and SQLite integrity loops stop at the deadline and return a failed
+    report tagged ``timeout`` and ``partial``; such reports are not cached.
+
+    ``expansion_limits`` (default ``DEFAULT_EXPANSION_LIMITS``) caps what
+    ZIP, Office, tar and 7z files may declare they expand to. Over-limit
+    archives fail with the ``expansion_limit`` tag before any decompression.
+
+    ``keep_state`` marks a gate stage whose deep stage follows in this
+    process: inspectors may leave their parse state in ``STAGE_STATE`` for
+    the deep check to resume (used by the staged pipeline).
+    """
+    if timeout is not None and timeout <= 0:
+        raise ValueError("timeout must be > 0")
     start = time.perf_counter()
     normalized_mode = None
     abs_path = os.path.abspath(file_path)
@@ -73,15 +143,17 @@ def inspect_file_report(
     cache_key = None
     if use_cache:
         try:
-            stat = os.stat(abs_path)
-            cache_key = (
+            if stat_result is None:
+                stat_result = os.stat(abs_path)
+            cache_key = _build_cache_key(
                 abs_path,
-                stat.st_size,
-                stat.st_mtime_ns,
+                stat_result,
                 normalized_mode,
                 signature_precheck,
                 normalized_allowlist,
                 normalized_denylist,
+                content_sniffing,
+                expansion_limits,
             )
         except FileNotFoundError as exc:
             report = InspectionReport(
@@ -96,7 +168,7 @@ def inspect_file_report(
             return report.with_duration((time.perf_counter() - start) * 1000)
 
         cache = cache or DEFAULT_CACHE
-        cached = cache.get(cache_key)
+        cached = _cache_get(cache, cache_key)
         if cached:
             return cached.with_cache_hit(True).with_duration(
                 (time.perf_counter() - start) * 1000
@@ -109,6 +181,11 @@ def inspect_file_report(
             signature_precheck=signature_precheck,
             signature_precheck_allowlist=normalized_allowlist,
             signature_precheck_denylist=normalized_denylist,
+            stat_result=stat_result,
+            content_sniffing=content_sniffing,
+            deadline=None if timeout is None else time.monotonic() + timeout,
+            keep_state=keep_state,
+            expansion_limits=expansion_limits,
         )
         finding = inspector.inspect()
         report = InspectionReport(
@@ -119,6 +196,8 @@ def inspect_file_report(
             message=finding.message,
             tags=finding.tags,
             error=finding.error,
+            declared_type=inspector.declared_type,
+            detected_type=inspector.detected_type,
         )
     except FileNotFoundError as exc:
         report = InspectionReport(
@@ -130,6 +209,17 @@ def inspect_file_report(
             tags=(TAG_NOT_FOUND,),
             error=str(exc),
         )
+    except MemoryError as exc:
+        # Raised when a sandboxed worker hits its address-space limit.
+        report = InspectionReport(
+            file_path=abs_path,
+            extension=extension,
+            mode=normalized_mode,
+            ok=False,
+            message="Inspection aborted: memory limit exceeded.",
+            tags=(TAG_RESOURCE_LIMIT,),
+            error=str(exc) or "MemoryError",
+        )
     except Exception as exc:
         report = InspectionReport(
             file_path=abs_path,
@@ -143,14 +233,118 @@ def inspect_file_report(
 
     report = report.with_duration((time.perf_counter() - start) * 1000)
 
-    if use_cache and cache_key is not None:
+    if use_cache and cache_key is not None and _is_cacheable(report):
         cache = cache or DEFAULT_CACHE
-        if TAG_NOT_FOUND not in report.tags and TAG_INVALID_MODE not in report.tags:
-            cache.set(cache_key, report)
+        cache.set(cache_key, report)
 
     return report
 
 
+# Position of ``normalized_mode`` in the tuple built by ``_build_cache_key``.
+_CACHE_KEY_MODE_INDEX = 3
+
+
+def _build_cache_key(
+    abs_path: str,
+    stat_result: os.stat_result,
+    normalized_mode: str,
+    signature_precheck: bool,
+    normalized_allowlist: Optional[Tuple[str, ...]],
+    normalized_denylist: Optional[Tuple[str, ...]],
+    content_sniffing: bool = False,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> Tuple:
+    # Limits are part of the key (as a JSON-friendly tuple) since they decide
+    # whether an archive passes; the defaults keep the shorter key.
+    limits_key = None
+    if expansion_limits is not None and expansion_limits != DEFAULT_EXPANSION_LIMITS:
+        limits_key = astuple(expansion_limits)
+    return (
+        abs_path,
+        stat_result.st_size,
+        stat_result.st_mtime_ns,
+        normalized_mode,
+        signature_precheck,
+        normalized_allowlist,
+        normalized_denylist,
+        content_sniffing,
+        limits_key,
+    )
+
+
+def _cache_get(cache: InspectionCache, cache_key: Tuple) -> Optional[InspectionReport]:
+    """
+    Look ``cache_key`` up, falling back to the modes in ``MODE_DOMINANCE``.
+
+    A deep answer is at least as strong as a fast one, so a cached deep
+    report is returned for a fast lookup, relabeled with the requested mode
+    and ``satisfied_by`` set to the mode that produced it. A partial deep
+    report (a check stopped by its byte budget) does not stand in for fast.
+    """
+    cached = cache.get(cache_key)
+    if cached:
+        return cached
+    index = _CACHE_KEY_MODE_INDEX
+    requested_mode = cache_key[index]
+    for stronger_mode in MODE_DOMINANCE.get(requested_mode, ()):
+        stronger_key = (*cache_key[:index], stronger_mode, *cache_key[index + 1 :])
+        cached = cache.get(stronger_key)
+        if cached and TAG_PARTIAL not in cached.tags:
+            return replace(cached, mode=requested_mode, satisfied_by=cached.mode)
+    return None
+
+
+def _is_cacheable(report: InspectionReport) -> bool:
+    # Timed-out and resource-limited results depend on the limits, not just the file.
+    uncacheable = {TAG_NOT_FOUND, TAG_INVALID_MODE, TAG_TIMEOUT, TAG_RESOURCE_LIMIT}
+    return not uncacheable & set(report.tags)
+
+
+def _parent_cache_lookup(
+    path: str,
+    mode: str,
+    cache: InspectionCache,
+    signature_precheck: bool,
+    signature_precheck_allowlist: Optional[Iterable[str]],
+    signature_precheck_denylist: Optional[Iterable[str]],
+    stat_result: Optional[os.stat_result] = None,
+    content_sniffing: bool = False,
+    expansion_limits: Optional[ExpansionLimits] = None,
+):
+    """
+    Check the cache in the parent before a path is sent to a worker process.
+
+    Returns ``(cache_key, stat_result, cached_report)``. The stat result is
+    forwarded to the worker so the file is not stat'ed again there; a missing
+    key means the worker should produce (and report) the error itself.
+    """
+    start = time.perf_counter()
+    try:
+        normalized_mode = normalize_mode(mode)
+    except ValueError:
+        return None, stat_result, None
+    abs_path = os.path.abspath(path)
+    try:
+        if stat_result is None:
+            stat_result = os.stat(abs_path)
+    except OSError:
+        return None, None, None
+    cache_key = _build_cache_key(
+        abs_path,
+        stat_result,
+        normalized_mode,
+        signature_precheck,
+        _normalize_extension_filter(signature_precheck_allowlist),
+        _normalize_extension_filter(signature_precheck_denylist),
+        content_sniffing,
+        expansion_limits,
+    )
+    cached = _cache_get(cache, cache_key)
+    if cached:
+        cached = cached.with_cache_hit(True).with_duration((time.perf_counter() - start) * 1000)
+    return cache_key, stat_result, cached
+
+
 def inspect_file(
     file_path: str,
     mode: str = "deep",
@@ -160,6 +354,9 @@ def inspect_file(
     signature_precheck: bool = True,
     signature_precheck_allowlist: Optional[Iterable[str]] = None,
     signature_precheck_denylist: Optional[Iterable[str]] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
 ):
     report = inspect_file_report(
         file_path,
@@ -169,6 +366,9 @@ def inspect_file(
         signature_precheck=signature_precheck,
         signature_precheck_allowlist=signature_precheck_allowlist,
         signature_precheck_denylist=signature_precheck_denylist,
+        content_sniffing=content_sniffing,
+        timeout=timeout,
+        expansion_limits=expansion_limits,
     )
     if return_report:
         return report
@@ -187,20 +387,73 @@ def inspect_files(
     signature_precheck_allowlist: Optional[Iterable[str]] = None,
     signature_precheck_denylist: Optional[Iterable[str]] = None,
     staged_deep_allowlist: Optional[Iterable[str]] = None,
+    content_dedup: bool = False,
+    content_dedup_strategy: str = FINGERPRINT_FULL,
+    pool: Optional[InspectionPool] = None,
+    chunk_size: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_MAX_BYTES,
+    hybrid: bool = False,
+    content_sniffing: bool = False,
+    signature_triage: bool = False,
+    staged_gate: str = "fast",
+    cost_estimator: Optional[CostEstimator] = None,
+    timeout: Optional[float] = None,
+    stage_plans: Optional[Mapping[str, Sequence[str]]] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
 ):
-    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+    """
+    Inspect many files; reports come back in input order.
+
+    ``staged_deep``, ``signature_triage`` and ``stage_plans`` turn the batch
+    into a pipeline of per-extension stage plans (see ``ErrorFile.pipeline``):
+    each file moves to its next stage as soon as it passes the current one,
+    and files that fail an early stage are reported with the requested mode.
+    """
+    from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+    if content_dedup and content_dedup_strategy not in SUPPORTED_FINGERPRINT_STRATEGIES:
+        raise ValueError("Unsupported content_dedup_strategy; allowed: full, sampled")
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+    if staged_gate not in STAGED_GATE_MODES:
+        raise ValueError("Unsupported staged_gate; allowed: fast, tail, signature")
+    if timeout is not None and timeout <= 0:
+        raise ValueError("timeout must be > 0")
 
     paths = list(file_paths)
     if not paths:
         return []
 
-    if use_processes:
-        executor_cls = ProcessPoolExecutor
-        # Shared in-memory cache cannot be used across processes safely.
-        use_cache = False
-        cache = None
-    else:
-        executor_cls = ThreadPoolExecutor
+    normalized_mode = None
+    try:
+        normalized_mode = normalize_mode(mode)
+    except ValueError:
+        pass
+    # A signature pass in front of fast/deep drops bad headers before any parser runs.
+    signature_first = signature_triage and normalized_mode in ("fast", "deep")
+    staged = staged_deep and normalized_mode == "deep"
+
+    if pool is not None and not hybrid:
+        use_processes = pool.use_processes
+    # Hybrid batches send CPU-bound inspectors to processes and the rest to threads.
+    # Signature/tail checks only read a few bytes and always run on threads, in chunks.
+    use_thread_pool = hybrid or not use_processes or normalized_mode in LIGHTWEIGHT_MODES
+    use_process_pool = (hybrid or use_processes) and normalized_mode not in LIGHTWEIGHT_MODES
+    # Workers cannot share the in-memory cache; for chunked paths the parent
+    # looks results up before dispatch and stores what workers send back.
+    shared_cache = (cache or DEFAULT_CACHE) if use_cache else None
+    chunk_max_files = chunk_size or DEFAULT_CHUNK_MAX_FILES
+    # A killed sandbox worker must map to exactly one file.
+    sandboxed = pool is not None and pool.sandbox is not None
+    estimate_cost = cost_estimator or estimate_inspection_cost
+
+    def _largest_first(tasks, target_mode):
+        # LPT: start the longest jobs first so one straggler can't hold up the tail.
+        return sorted(
+            tasks,
+            key=lambda task: estimate_cost(task[0], task[-1], target_mode),
+            reverse=True,
+        )
 
     index_groups = {}
     for index, path in enumerate(paths):
@@ -208,108 +461,593 @@ def inspect_files(
 
     unique_paths = list(index_groups.keys())
     results = [None] * len(paths)
+    # Deduplication stats every file up front; later stages reuse the results.
+    known_stats = (
+        {path: _stat_or_none(path) for path in unique_paths} if content_dedup else {}
+    )
+
+    def _stat_of(path):
+        return known_stats[path] if path in known_stats else _stat_or_none(path)
+
+    # Byte-identical files (same extension chain) share one inspection.
+    representatives = (
+        _group_identical_files(unique_paths, content_dedup_strategy, workers, known_stats)
+        if content_dedup
+        else {}
+    )
+    inspect_paths = [path for path in unique_paths if representatives.get(path, path) == path]
     normalized_staged_allowlist = _normalize_extension_filter(staged_deep_allowlist)
     staged_extensions = (
         normalized_staged_allowlist
         if normalized_staged_allowlist is not None
+        else DEFAULT_STAGED_TAIL_EXTENSIONS
+        if staged_gate == TAIL_MODE
         else DEFAULT_STAGED_FAST_EXTENSIONS
     )
+    # staged_deep, signature_triage and stage_plans all become per-extension stage plans.
+    default_plan = (normalized_mode,)
+    extension_plans = {}
+    if staged:
+        extension_plans = {
+            extension: (staged_gate, "deep") for extension in staged_extensions
+        }
+    if stage_plans is not None and normalized_mode is not None:
+        extension_plans.update(normalize_stage_plans(stage_plans, normalized_mode))
+    if signature_first:
+        default_plan = with_first_stage(default_plan, SIGNATURE_MODE)
+        extension_plans = {
+            extension: with_first_stage(plan, SIGNATURE_MODE)
+            for extension, plan in extension_plans.items()
+        }
+    pipelined = normalized_mode is not None and (
+        staged or signature_first or bool(extension_plans)
+    )
 
-    def _run_reports(target_paths, target_mode, target_signature_precheck):
+    def _run_reports(executors, target_paths, target_mode, target_signature_precheck):
+        thread_executor, process_executor = executors
+        # Signature/tail checks only read a few bytes: batch many files per thread call.
+        header_only = target_mode in LIGHTWEIGHT_MODES
+        chunk_executor = thread_executor if header_only else process_executor
         reports = {}
-        with executor_cls(max_workers=workers) as executor:
-            future_to_path = {
-                executor.submit(
-                    inspect_file_report,
+        thread_tasks = []
+        chunk_tasks = []
+        for path in target_paths:
+            if (
+                not header_only
+                and thread_executor is not None
+                and (
+                    process_executor is None
+                    or resolve_cost_class(path, target_mode) != COST_CLASS_CPU
+                )
+            ):
+                # Stat once here: the result orders the work and keys the cache.
+                thread_tasks.append((path, _stat_of(path)))
+                continue
+            cache_key = None
+            if shared_cache is not None:
+                cache_key, stat_result, cached = _parent_cache_lookup(
                     path,
                     target_mode,
-                    use_cache,
-                    cache,
+                    shared_cache,
                     target_signature_precheck,
                     signature_precheck_allowlist,
                     signature_precheck_denylist,
-                ): path
-                for path in target_paths
-            }
-            for future in as_completed(future_to_path):
-                reports[future_to_path[future]] = future.result()
-        return reports
+                    known_stats.get(path),
+                    content_sniffing=content_sniffing,
+                    expansion_limits=expansion_limits,
+                )
+                if cached is not None:
+                    reports[path] = cached
+                    continue
+            else:
+                stat_result = _stat_of(path)
+            chunk_tasks.append((path, cache_key, stat_result))
 
-    def _run_one_staged(path):
-        if not _path_matches_extensions(path, staged_extensions):
-            return inspect_file_report(
+        if not header_only:
+            thread_tasks = _largest_first(thread_tasks, target_mode)
+            chunk_tasks = _largest_first(chunk_tasks, target_mode)
+        thread_futures = {
+            thread_executor.submit(
+                inspect_file_report,
                 path,
-                "deep",
+                target_mode,
                 use_cache,
                 cache,
-                signature_precheck,
+                target_signature_precheck,
+                signature_precheck_allowlist,
+                signature_precheck_denylist,
+                stat_result,
+                content_sniffing,
+                timeout,
+                False,
+                expansion_limits,
+            ): path
+            for path, stat_result in thread_tasks
+        }
+        chunk_futures = {
+            chunk_executor.submit(
+                _inspect_chunk,
+                [(path, stat_result) for path, _, stat_result in chunk],
+                target_mode,
+                target_signature_precheck,
                 signature_precheck_allowlist,
                 signature_precheck_denylist,
+                content_sniffing,
+                timeout,
+                expansion_limits,
+            ): chunk
+            for chunk in _plan_chunks(
+                chunk_tasks,
+                1 if sandboxed and not header_only else chunk_max_files,
+                None if header_only else chunk_bytes,
             )
-        fast_report = inspect_file_report(
+        }
+        for future in as_completed([*thread_futures, *chunk_futures]):
+            if future in thread_futures:
+                reports[thread_futures[future]] = future.result()
+                continue
+            for (path, cache_key, _), report in zip(chunk_futures[future], future.result()):
+                if cache_key is not None and _is_cacheable(report):
+                    shared_cache.set(cache_key, report)
+                reports[path] = report
+        return reports
+
+    gate_executors = {}
+
+    def _submit_stage(executors, path, stat_result, stage_mode, stage_precheck):
+        thread_executor, process_executor = executors
+        keep_state = False
+        if _runs_in_worker(executors, path, stage_mode):
+            # CPU-bound stages, gates included, go to worker processes.
+            return _submit_to_worker(
+                process_executor, path, stat_result, stage_mode, stage_precheck
+            )
+        if stage_mode != normalized_mode:
+            # Each gate stage has its own threads, so cheap checks never
+            # queue behind the batch's deep work.
+            executor = gate_executors.get(stage_mode)
+            if executor is None:
+                executor = gate_executors[stage_mode] = stack.enter_context(
+                    ThreadPoolExecutor(max_workers=workers)
+                )
+            # Parse state can only be handed over within this process.
+            keep_state = not _runs_in_worker(executors, path, normalized_mode)
+        else:
+            executor = thread_executor
+        return executor.submit(
+            inspect_file_report,
             path,
-            "fast",
+            stage_mode,
             use_cache,
             cache,
-            signature_precheck,
+            stage_precheck,
             signature_precheck_allowlist,
             signature_precheck_denylist,
+            stat_result,
+            content_sniffing,
+            timeout,
+            keep_state,
+            expansion_limits,
         )
-        if not fast_report.ok:
-            return _report_with_mode(fast_report, "deep")
-        return inspect_file_report(
+
+    def _runs_in_worker(executors, path, stage_mode):
+        """Whether ``stage_mode`` for ``path`` goes to the process executor."""
+        thread_executor, process_executor = executors
+        if stage_mode in LIGHTWEIGHT_MODES:
+            return False
+        return process_executor is not None and (
+            thread_executor is None
+            or resolve_cost_class(path, stage_mode) == COST_CLASS_CPU
+        )
+
+    def _submit_to_worker(executor, path, stat_result, stage_mode, stage_precheck):
+        cache_key = None
+        if shared_cache is not None:
+            cache_key, stat_result, cached = _parent_cache_lookup(
+                path,
+                stage_mode,
+                shared_cache,
+                stage_precheck,
+                signature_precheck_allowlist,
+                signature_precheck_denylist,
+                stat_result,
+                content_sniffing,
+                expansion_limits,
+            )
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+        future = executor.submit(
+            inspect_file_report,
             path,
-            "deep",
-            use_cache,
-            cache,
+            stage_mode,
             False,
+            None,
+            stage_precheck,
             signature_precheck_allowlist,
             signature_precheck_denylist,
+            stat_result,
+            content_sniffing,
+            timeout,
+            False,
+            expansion_limits,
         )
+        if cache_key is not None:
 
-    normalized_mode = None
-    try:
-        normalized_mode = normalize_mode(mode)
-    except ValueError:
-        pass
+            def _store(done):
+                if done.exception() is None and _is_cacheable(done.result()):
+                    shared_cache.set(cache_key, done.result())
+
+            future.add_done_callback(_store)
+        return future
 
     unique_reports = {}
-    if staged_deep and normalized_mode == "deep" and not use_processes:
-        with executor_cls(max_workers=workers) as executor:
-            future_to_path = {
-                executor.submit(_run_one_staged, path): path for path in unique_paths
-            }
-            for future in as_completed(future_to_path):
-                unique_reports[future_to_path[future]] = future.result()
-    elif staged_deep and normalized_mode == "deep":
-        staged_paths = [path for path in unique_paths if _path_matches_extensions(path, staged_extensions)]
-        passthrough_paths = [
-            path for path in unique_paths if not _path_matches_extensions(path, staged_extensions)
-        ]
-        fast_reports = _run_reports(staged_paths, "fast", signature_precheck) if staged_paths else {}
-        deep_targets = [path for path, report in fast_reports.items() if report.ok]
-        deep_reports = _run_reports(deep_targets, "deep", False) if deep_targets else {}
-        passthrough_reports = (
-            _run_reports(passthrough_paths, "deep", signature_precheck)
-            if passthrough_paths
-            else {}
-        )
-        unique_reports.update(passthrough_reports)
-        for path in staged_paths:
-            report = deep_reports.get(path)
-            if report is None:
-                report = _report_with_mode(fast_reports[path], "deep")
-            unique_reports[path] = report
-    else:
-        unique_reports = _run_reports(unique_paths, mode, signature_precheck)
+    # One executor per kind (or the caller's warm pool) serves every stage of the batch.
+    with ExitStack() as stack:
+        thread_executor = process_executor = None
+        if use_thread_pool:
+            thread_executor = stack.enter_context(
+                _executor_scope(_pool_of_kind(pool, False), ThreadPoolExecutor, workers)
+            )
+        if use_process_pool:
+            process_executor = stack.enter_context(
+                _executor_scope(_pool_of_kind(pool, True), ProcessPoolExecutor, workers)
+            )
+        executors = (thread_executor, process_executor)
+
+        if pipelined:
+            tasks = []
+            for path in inspect_paths:
+                stat_result = _stat_of(path)
+                if shared_cache is not None:
+                    # A cached final answer skips every gate stage.
+                    _, stat_result, cached = _parent_cache_lookup(
+                        path,
+                        normalized_mode,
+                        shared_cache,
+                        signature_precheck,
+                        signature_precheck_allowlist,
+                        signature_precheck_denylist,
+                        stat_result,
+                        content_sniffing,
+                        expansion_limits,
+                    )
+                    if cached is not None:
+                        unique_reports[path] = cached
+                        continue
+                tasks.append((path, stat_result))
+            tasks = _largest_first(tasks, normalized_mode)
+            plans = {path: stage_plan_for(path, extension_plans, default_plan) for path, _ in tasks}
+            pipeline_reports = run_pipeline(
+                tasks,
+                plans,
+                lambda *stage: _submit_stage(executors, *stage),
+                signature_precheck,
+            )
+            for path, report in pipeline_reports.items():
+                # Files that dropped out early report the mode that was asked for.
+                unique_reports[path] = _report_with_mode(report, normalized_mode)
+        else:
+            unique_reports.update(
+                _run_reports(executors, inspect_paths, mode, signature_precheck)
+            )
 
     for path in unique_paths:
-        report = unique_reports[path]
+        representative = representatives.get(path, path)
+        report = unique_reports[representative]
+        if representative != path:
+            report = _report_reused(report, path)
         for index in index_groups[path]:
             results[index] = report
     return results
 
 
+def iter_inspect_files(
+    file_paths: Iterable[str],
+    mode: str = "deep",
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    use_cache: bool = True,
+    cache: Optional[InspectionCache] = None,
+    signature_precheck: bool = True,
+    signature_precheck_allowlist: Optional[Iterable[str]] = None,
+    signature_precheck_denylist: Optional[Iterable[str]] = None,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = False,
+    pool: Optional[InspectionPool] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> Iterator[InspectionReport]:
+    """
+    Stream reports for a lazily consumed iterable of paths.
+
+    At most ``max_in_flight`` paths are pending at any time (including reports
+    buffered to preserve input order), so memory stays flat regardless of the
+    input size. Unlike ``inspect_files`` paths are not deduplicated.
+    """
+    return _iter_reports(
+        ((path, None) for path in file_paths),
+        mode=mode,
+        workers=workers,
+        use_processes=use_processes,
+        use_cache=use_cache,
+        cache=cache,
+        signature_precheck=signature_precheck,
+        signature_precheck_allowlist=signature_precheck_allowlist,
+        signature_precheck_denylist=signature_precheck_denylist,
+        max_in_flight=max_in_flight,
+        ordered=ordered,
+        pool=pool,
+        content_sniffing=content_sniffing,
+        timeout=timeout,
+        expansion_limits=expansion_limits,
+    )
+
+
+def inspect_tree(
+    root: str,
+    mode: str = "deep",
+    workers: Optional[int] = None,
+    use_processes: bool = False,
+    use_cache: bool = True,
+    cache: Optional[InspectionCache] = None,
+    signature_precheck: bool = True,
+    signature_precheck_allowlist: Optional[Iterable[str]] = None,
+    signature_precheck_denylist: Optional[Iterable[str]] = None,
+    extensions: Optional[Iterable[str]] = None,
+    walk_workers: Optional[int] = None,
+    follow_symlinks: bool = False,
+    max_in_flight: Optional[int] = None,
+    pool: Optional[InspectionPool] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> Iterator[InspectionReport]:
+    """
+    Walk ``root`` in parallel and stream a report for every supported file.
+
+    Files are filtered by ``extensions`` (default: every extension registered in
+    ``INSPECTOR_REGISTRY``, or every file when ``content_sniffing`` is on). The
+    stat result gathered while walking is reused for the cache key and the
+    inspector, so each file is stat'ed exactly once.
+    """
+    return _iter_reports(
+        iter_tree_entries(
+            root,
+            extensions=extensions,
+            workers=walk_workers,
+            follow_symlinks=follow_symlinks,
+            all_files=content_sniffing and extensions is None,
+        ),
+        mode=mode,
+        workers=workers,
+        use_processes=use_processes,
+        use_cache=use_cache,
+        cache=cache,
+        signature_precheck=signature_precheck,
+        signature_precheck_allowlist=signature_precheck_allowlist,
+        signature_precheck_denylist=signature_precheck_denylist,
+        max_in_flight=max_in_flight,
+        ordered=False,
+        pool=pool,
+        content_sniffing=content_sniffing,
+        timeout=timeout,
+        expansion_limits=expansion_limits,
+    )
+
+
+def _iter_reports(
+    tasks: Iterable[Tuple[str, Optional[os.stat_result]]],
+    mode: str,
+    workers: Optional[int],
+    use_processes: bool,
+    use_cache: bool,
+    cache: Optional[InspectionCache],
+    signature_precheck: bool,
+    signature_precheck_allowlist: Optional[Iterable[str]],
+    signature_precheck_denylist: Optional[Iterable[str]],
+    max_in_flight: Optional[int],
+    ordered: bool,
+    pool: Optional[InspectionPool] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> Iterator[InspectionReport]:
+    from concurrent.futures import (
+        FIRST_COMPLETED,
+        ProcessPoolExecutor,
+        ThreadPoolExecutor,
+        wait,
+    )
+
+    if pool is not None:
+        use_processes = pool.use_processes
+        workers = pool.workers
+    elif mode in LIGHTWEIGHT_MODES:
+        # Head/tail reads gain nothing from worker processes.
+        use_processes = False
+    if max_in_flight is None:
+        max_in_flight = (workers or os.cpu_count() or 1) * 4
+    if max_in_flight <= 0:
+        raise ValueError("max_in_flight must be > 0")
+    if timeout is not None and timeout <= 0:
+        raise ValueError("timeout must be > 0")
+
+    parent_cache = None
+    if use_processes:
+        executor_cls = ProcessPoolExecutor
+        # Workers cannot share the in-memory cache; the parent looks results up
+        # before dispatch and stores what the workers send back.
+        if use_cache:
+            parent_cache = cache or DEFAULT_CACHE
+        use_cache = False
+        cache = None
+    else:
+        executor_cls = ThreadPoolExecutor
+
+    task_iterator = iter(tasks)
+    pending = {}
+    buffered = {}
+    cache_keys = {}
+    submitted = 0
+    next_index = 0
+    exhausted = False
+
+    with _executor_scope(pool, executor_cls, workers) as executor:
+        try:
+            while True:
+                while not exhausted and len(pending) + len(buffered) < max_in_flight:
+                    try:
+                        path, stat_result = next(task_iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    index = submitted
+                    submitted += 1
+                    if parent_cache is not None:
+                        cache_key, stat_result, cached = _parent_cache_lookup(
+                            path,
+                            mode,
+                            parent_cache,
+                            signature_precheck,
+                            signature_precheck_allowlist,
+                            signature_precheck_denylist,
+                            stat_result,
+                            content_sniffing,
+                            expansion_limits,
+                        )
+                        if cached is not None:
+                            if ordered:
+                                buffered[index] = cached
+                            else:
+                                yield cached
+                            continue
+                        cache_keys[index] = cache_key
+                    future = executor.submit(
+                        inspect_file_report,
+                        path,
+                        mode,
+                        use_cache,
+                        cache,
+                        signature_precheck,
+                        signature_precheck_allowlist,
+                        signature_precheck_denylist,
+                        stat_result,
+                        content_sniffing,
+                        timeout,
+                        False,
+                        expansion_limits,
+                    )
+                    pending[future] = index
+
+                if pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                else:
+                    done = ()
+                for future in done:
+                    index = pending.pop(future)
+                    report = future.result()
+                    cache_key = cache_keys.pop(index, None)
+                    if cache_key is not None and _is_cacheable(report):
+                        parent_cache.set(cache_key, report)
+                    if ordered:
+                        buffered[index] = report
+                    else:
+                        yield report
+
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+
+                if exhausted and not pending and not buffered:
+                    break
+        finally:
+            # Drop queued work when the consumer stops iterating early.
+            for future in pending:
+                future.cancel()
+
+
+def _inspect_chunk(
+    tasks: List[Tuple[str, Optional[os.stat_result]]],
+    mode: str,
+    signature_precheck: bool,
+    signature_precheck_allowlist: Optional[Iterable[str]],
+    signature_precheck_denylist: Optional[Iterable[str]],
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> List[InspectionReport]:
+    """Worker-side entry point: inspect a chunk of paths in one call."""
+    return [
+        inspect_file_report(
+            path,
+            mode,
+            False,
+            None,
+            signature_precheck,
+            signature_precheck_allowlist,
+            signature_precheck_denylist,
+            stat_result,
+            content_sniffing,
+            timeout,
+            False,
+            expansion_limits,
+        )
+        for path, stat_result in tasks
+    ]
+
+
+def _plan_chunks(dispatch, max_files: int, max_bytes: Optional[int]):
+    """
+    Group small files up to ``max_files``/``max_bytes``; large files go alone.
+
+    ``max_bytes=None`` groups by count only (for header-only reads).
+    """
+    if max_bytes is None:
+        max_bytes = float("inf")
+    chunk = []
+    chunk_bytes = 0
+    for task in dispatch:
+        stat_result = task[2]
+        size = stat_result.st_size if stat_result is not None else 0
+        if size >= max_bytes:
+            yield [task]
+            continue
+        if chunk and (len(chunk) >= max_files or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk = []
+            chunk_bytes = 0
+        chunk.append(task)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def _pool_of_kind(pool: Optional[InspectionPool], processes: bool) -> Optional[InspectionPool]:
+    if pool is not None and pool.use_processes == processes:
+        return pool
+    return None
+
+
+@contextmanager
+def _executor_scope(pool: Optional[InspectionPool], executor_cls, workers: Optional[int]):
+    """Yield the caller's warm pool, or a fresh executor owned by this call."""
+    if pool is not None:
+        yield pool
+        return
+    with executor_cls(max_workers=workers) as executor:
+        yield executor
+
+
 def _normalize_extension_filter(
     extensions: Optional[Iterable[str]],
 ) -> Optional[Tuple[str, ...]]:
@@ -327,31 +1065,66 @@ def _normalize_extension_filter(
 def _report_with_mode(report: InspectionReport, mode: str) -> InspectionReport:
     if report.mode == mode:
         return report
-    return InspectionReport(
-        file_path=report.file_path,
-        extension=report.extension,
-        mode=mode,
-        ok=report.ok,
-        message=report.message,
-        tags=report.tags,
-        error=report.error,
-        cache_hit=report.cache_hit,
-        duration_ms=report.duration_ms,
+    return replace(report, mode=mode)
+
+
+def _report_reused(report: InspectionReport, path: str) -> InspectionReport:
+    abs_path = os.path.abspath(path)
+    return replace(
+        report,
+        file_path=abs_path,
+        extension=os.path.splitext(abs_path)[-1].lower(),
+        reused_from=report.file_path,
     )
 
 
-def _path_matches_extensions(path: str, extensions: Iterable[str]) -> bool:
-    lowered = path.lower()
-    for extension in sorted(extensions, key=len, reverse=True):
-        if lowered.endswith(extension):
-            return True
-    return False
+def _group_identical_files(paths, strategy: str, workers: Optional[int], stat_results):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _fingerprint(path):
+        try:
+            return file_fingerprint(path, strategy, stat_results[path])
+        except OSError:
+            # Unreadable files are inspected on their own and report the error.
+            return None
+
+    # Only files whose size (and extension chain) another file shares can be
+    # duplicates, so everything else is never read.
+    paths_by_size = {}
+    for path in paths:
+        stat_result = stat_results[path]
+        if stat_result is not None:
+            size_key = (_extension_candidates(path.lower()), stat_result.st_size)
+            paths_by_size.setdefault(size_key, []).append(path)
+    candidates = [path for group in paths_by_size.values() if len(group) > 1 for path in group]
+
+    representatives = {}
+    first_path_by_key = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path, fingerprint in zip(candidates, executor.map(_fingerprint, candidates)):
+            if fingerprint is None:
+                continue
+            key = (_extension_candidates(path.lower()), fingerprint)
+            representatives[path] = first_path_by_key.setdefault(key, path)
+    return representatives
 
 
 __all__ = [
     "InspectionReport",
     "DEFAULT_CACHE",
+    "ExpansionLimits",
+    "InspectionPool",
+    "PersistentInspectionCache",
+    "SandboxLimits",
+    "ainspect_file_report",
+    "ainspect_files",
+    "aiter_inspect_files",
+    "estimate_inspection_cost",
     "inspect_file",
     "inspect_file_report",
     "inspect_files",
+    "inspect_tree",
+    "iter_inspect_files",
+    "iter_tree_entries",
+    "warm_plugins",
 ]
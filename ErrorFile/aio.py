@@ -0,0 +1,236 @@
+"""asyncio front-end for the inspection APIs."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .cache import InspectionCache
+from .expansion import ExpansionLimits
+from .report import InspectionReport
+
+PathSource = Union[Iterable[str], AsyncIterable[str]]
+
+
+async def ainspect_file_report(
+    file_path: str,
+    mode: str = "deep",
+    use_cache: bool = True,
+    cache: Optional[InspectionCache] = None,
+    signature_precheck: bool = True,
+    signature_precheck_allowlist: Optional[Iterable[str]] = None,
+    signature_precheck_denylist: Optional[Iterable[str]] = None,
+    executor: Optional[Executor] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> InspectionReport:
+    """
+    Run ``inspect_file_report`` in ``executor`` (default: the loop's executor).
+
+    Pass a shared ``semaphore`` to bound concurrent inspections across callers.
+    Cancelling the awaiting task drops the call if it has not started yet.
+    """
+    from . import inspect_file_report
+
+    call = functools.partial(
+        inspect_file_report,
+        file_path,
+        mode,
+        use_cache,
+        cache,
+        signature_precheck,
+        signature_precheck_allowlist,
+        signature_precheck_denylist,
+        content_sniffing=content_sniffing,
+        timeout=timeout,
+        expansion_limits=expansion_limits,
+    )
+    loop = asyncio.get_running_loop()
+    if semaphore is None:
+        return await loop.run_in_executor(executor, call)
+    async with semaphore:
+        return await loop.run_in_executor(executor, call)
+
+
+async def aiter_inspect_files(
+    file_paths: PathSource,
+    mode: str = "deep",
+    use_cache: bool = True,
+    cache: Optional[InspectionCache] = None,
+    signature_precheck: bool = True,
+    signature_precheck_allowlist: Optional[Iterable[str]] = None,
+    signature_precheck_denylist: Optional[Iterable[str]] = None,
+    concurrency: Optional[int] = None,
+    ordered: bool = False,
+    executor: Optional[Executor] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> AsyncIterator[InspectionReport]:
+    """
+    Yield reports for a sync or async iterable of paths as they complete.
+
+    At most ``concurrency`` inspections are pending at once (including
+    reports buffered for ``ordered=True``); closing the iterator or cancelling
+    the consuming task cancels everything still queued.
+    """
+    submit = _report_submitter(
+        mode,
+        use_cache,
+        cache,
+        signature_precheck,
+        signature_precheck_allowlist,
+        signature_precheck_denylist,
+        executor,
+        content_sniffing,
+        timeout,
+        expansion_limits,
+    )
+    async for _, report in _aiter_indexed(file_paths, submit, concurrency, ordered):
+        yield report
+
+
+async def ainspect_files(
+    file_paths: PathSource,
+    mode: str = "deep",
+    use_cache: bool = True,
+    cache: Optional[InspectionCache] = None,
+    signature_precheck: bool = True,
+    signature_precheck_allowlist: Optional[Iterable[str]] = None,
+    signature_precheck_denylist: Optional[Iterable[str]] = None,
+    concurrency: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> List[InspectionReport]:
+    """Async counterpart of ``inspect_files``: deduplicated, input-ordered results."""
+    paths = []
+    async for path in _aiter_paths(file_paths):
+        paths.append(path)
+
+    index_groups = {}
+    for index, path in enumerate(paths):
+        index_groups.setdefault(path, []).append(index)
+    unique_paths = list(index_groups.keys())
+    results: List[Optional[InspectionReport]] = [None] * len(paths)
+
+    submit = _report_submitter(
+        mode,
+        use_cache,
+        cache,
+        signature_precheck,
+        signature_precheck_allowlist,
+        signature_precheck_denylist,
+        executor,
+        content_sniffing,
+        timeout,
+        expansion_limits,
+    )
+    async for unique_index, report in _aiter_indexed(unique_paths, submit, concurrency, False):
+        for index in index_groups[unique_paths[unique_index]]:
+            results[index] = report
+    return results
+
+
+def _report_submitter(
+    mode: str,
+    use_cache: bool,
+    cache: Optional[InspectionCache],
+    signature_precheck: bool,
+    signature_precheck_allowlist: Optional[Iterable[str]],
+    signature_precheck_denylist: Optional[Iterable[str]],
+    executor: Optional[Executor],
+    content_sniffing: bool = False,
+    timeout: Optional[float] = None,
+    expansion_limits: Optional[ExpansionLimits] = None,
+) -> Callable[[str], Awaitable[InspectionReport]]:
+    def _submit(path: str) -> Awaitable[InspectionReport]:
+        return ainspect_file_report(
+            path,
+            mode,
+            use_cache,
+            cache,
+            signature_precheck,
+            signature_precheck_allowlist,
+            signature_precheck_denylist,
+            executor,
+            content_sniffing=content_sniffing,
+            timeout=timeout,
+            expansion_limits=expansion_limits,
+        )
+
+    return _submit
+
+
+async def _aiter_paths(file_paths: PathSource) -> AsyncIterator[str]:
+    if hasattr(file_paths, "__aiter__"):
+        async for path in file_paths:
+            yield path
+    else:
+        for path in file_paths:
+            yield path
+
+
+async def _aiter_indexed(
+    file_paths: PathSource,
+    submit: Callable[[str], Awaitable[Any]],
+    concurrency: Optional[int],
+    ordered: bool,
+) -> AsyncIterator[Tuple[int, Any]]:
+    if concurrency is None:
+        concurrency = (os.cpu_count() or 1) * 4
+    if concurrency <= 0:
+        raise ValueError("concurrency must be > 0")
+
+    source = _aiter_paths(file_paths).__aiter__()
+    pending = {}
+    buffered = {}
+    submitted = 0
+    next_index = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) + len(buffered) < concurrency:
+                try:
+                    path = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(submit(path))] = submitted
+                submitted += 1
+
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                if ordered:
+                    buffered[index] = task.result()
+                else:
+                    yield index, task.result()
+
+            while next_index in buffered:
+                yield next_index, buffered.pop(next_index)
+                next_index += 1
+    finally:
+        # Cancelled tasks drop their executor call if it has not started yet.
+        for task in pending:
+            task.cancel()
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import json
+import os
+import sqlite3
 import threading
+import time
 from collections import OrderedDict
-from typing import Any, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+from .report import InspectionReport
 
 
 class InspectionCache:
@@ -25,3 +31,179 @@ class InspectionCache:
             self._entries[key] = value
             if len(self._entries) > self._max_entries:
                 self._entries.popitem(last=False)
+
+
+class PersistentInspectionCache:
+    """
+    SQLite-backed report cache with the same ``get``/``set`` interface.
+
+    The database runs in WAL mode so readers never block the writer, and
+    several threads or processes may share one file. Writes (and LRU access
+    updates) are buffered and flushed in a single transaction every
+    ``batch_size`` operations; call ``flush()`` or ``close()`` (or use the
+    cache as a context manager) to persist the remainder. Once the table
+    grows past ``max_entries`` the least recently used rows are evicted.
+    Flushes track the row count as an upper bound and only count the table
+    when that bound passes ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 1_000_000,
+        batch_size: int = 256,
+        timeout: float = 30.0,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+        self._path = os.fspath(path)
+        self._max_entries = max_entries
+        self._batch_size = batch_size
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._pending_writes: Dict[str, Tuple[str, int]] = {}
+        self._pending_touches: Dict[str, int] = {}
+        # Upper bound on the table's rows (replaced keys count as new); None
+        # until counted. Other connections' inserts show up at the next count.
+        self._row_count: Optional[int] = None
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[Any]:
+        key_text = _encode_key(key)
+        with self._lock:
+            connection = self._connect()
+            pending = self._pending_writes.get(key_text)
+            if pending is not None:
+                return _decode_value(pending[0])
+            row = connection.execute(
+                "SELECT value FROM inspection_cache WHERE key = ?", (key_text,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._pending_touches[key_text] = time.time_ns()
+            self._flush_if_full()
+            return _decode_value(row[0])
+
+    def set(self, key: Tuple[Any, ...], value: Any) -> None:
+        key_text = _encode_key(key)
+        value_text = _encode_value(value)
+        with self._lock:
+            self._connect()
+            self._pending_writes[key_text] = (value_text, time.time_ns())
+            self._pending_touches.pop(key_text, None)
+            self._flush_if_full()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._flush()
+            finally:
+                self._connection.close()
+                self._connection = None
+                self._pid = None
+
+    def __enter__(self) -> "PersistentInspectionCache":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._connection is not None and self._pid == pid:
+            return self._connection
+        if self._pid is not None and self._pid != pid:
+            # Forked child: the inherited connection and buffers belong to the parent.
+            self._connection = None
+            self._pending_writes.clear()
+            self._pending_touches.clear()
+        connection = sqlite3.connect(
+            self._path,
+            timeout=self._timeout,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS inspection_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS inspection_cache_accessed_at "
+            "ON inspection_cache (accessed_at)"
+        )
+        self._connection = connection
+        self._pid = pid
+        self._row_count = None
+        return connection
+
+    def _flush_if_full(self) -> None:
+        if len(self._pending_writes) + len(self._pending_touches) >= self._batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending_writes and not self._pending_touches:
+            return
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(
+                "INSERT OR REPLACE INTO inspection_cache (key, value, accessed_at) "
+                "VALUES (?, ?, ?)",
+                [
+                    (key_text, value_text, accessed_at)
+                    for key_text, (value_text, accessed_at) in self._pending_writes.items()
+                ],
+            )
+            connection.executemany(
+                "UPDATE inspection_cache SET accessed_at = ? WHERE key = ?",
+                [
+                    (accessed_at, key_text)
+                    for key_text, accessed_at in self._pending_touches.items()
+                ],
+            )
+            row_count = self._row_count
+            if row_count is not None:
+                row_count += len(self._pending_writes)
+            if row_count is None or row_count > self._max_entries:
+                (row_count,) = connection.execute(
+                    "SELECT COUNT(*) FROM inspection_cache"
+                ).fetchone()
+                if row_count > self._max_entries:
+                    connection.execute(
+                        "DELETE FROM inspection_cache WHERE key IN ("
+                        "SELECT key FROM inspection_cache ORDER BY accessed_at ASC LIMIT ?)",
+                        (row_count - self._max_entries,),
+                    )
+                    row_count = self._max_entries
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._row_count = row_count
+        self._pending_writes.clear()
+        self._pending_touches.clear()
+
+
+def _encode_key(key: Tuple[Any, ...]) -> str:
+    return json.dumps(key, separators=(",", ":"), ensure_ascii=False)
+
+
+def _encode_value(value: Any) -> str:
+    if not isinstance(value, InspectionReport):
+        raise TypeError("PersistentInspectionCache only stores InspectionReport values")
+    return json.dumps(value.as_dict(), separators=(",", ":"), ensure_ascii=False)
+
+
+def _decode_value(value_text: str) -> InspectionReport:
+    return InspectionReport.from_dict(json.loads(value_text))
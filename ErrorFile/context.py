@@ -0,0 +1,202 @@
+"""Per-file state shared between FileInspector and inspectors."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, BinaryIO, Hashable, Optional
+
+if TYPE_CHECKING:
+    from .expansion import ExpansionLimits
+
+
+class InspectionTimeout(Exception):
+    """Raised by ``FileContext.check_deadline`` once the per-file deadline passes."""
+
+
+class StageStateStore:
+    """
+    Bounded hand-off of parse state from a gate stage to the deep stage.
+
+    A fast check that already parsed a file can leave its parser behind so
+    the deep check resumes instead of parsing again. Entries are single-use,
+    keyed by path, size and mtime, expire after ``ttl_seconds`` and are
+    evicted least-recently-stored beyond ``max_entries``; evicted states with
+    a ``close()`` method are closed, releasing any handle they hold.
+    """
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: Hashable, state: Any) -> None:
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                evicted.append(previous[1])
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, state)
+            now = time.monotonic()
+            while self._entries:
+                oldest_key, (expires, oldest) = next(iter(self._entries.items()))
+                if len(self._entries) <= self.max_entries and expires > now:
+                    break
+                del self._entries[oldest_key]
+                evicted.append(oldest)
+        for old_state in evicted:
+            _close_state(old_state)
+
+    def take(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        expires, state = entry
+        if expires <= time.monotonic():
+            _close_state(state)
+            return None
+        return state
+
+    def clear(self) -> None:
+        with self._lock:
+            states = [state for _, state in self._entries.values()]
+            self._entries.clear()
+        for state in states:
+            _close_state(state)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _close_state(state: Any) -> None:
+    close = getattr(state, "close", None)
+    if close is not None:
+        close()
+
+
+STAGE_STATE = StageStateStore()
+
+
+class FileContext:
+    """
+    One stat, one open handle and one prefetched header per inspected file.
+
+    ``FileInspector`` builds a context for every inspection and hands it to
+    inspectors that opt in (see ``plugins.uses_file_context``), so header
+    sniffing, signature prechecks and the inspector itself share the same
+    syscalls instead of each re-opening the file.
+    """
+
+    HEADER_SIZE = 64
+
+    def __init__(
+        self,
+        file_path: str,
+        stat_result: Optional[os.stat_result] = None,
+        deadline: Optional[float] = None,
+        keep_state: bool = False,
+        expansion_limits: Optional[ExpansionLimits] = None,
+    ):
+        self.file_path = file_path
+        # Absolute ``time.monotonic()`` value; ``None`` means no deadline.
+        self.deadline = deadline
+        # Set for gate stages whose deep stage runs later in this process.
+        self.keep_state = keep_state
+        # Archive screening limits; ``None`` means ``DEFAULT_EXPANSION_LIMITS``.
+        self.expansion_limits = expansion_limits
+        self._stat_result = stat_result
+        self._file: Optional[BinaryIO] = None
+        self._header: Optional[bytes] = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    @property
+    def stat(self) -> os.stat_result:
+        if self._stat_result is None:
+            self._stat_result = os.stat(self.file_path)
+        return self._stat_result
+
+    @property
+    def size(self) -> int:
+        return self.stat.st_size
+
+    @property
+    def header(self) -> bytes:
+        """The first ``HEADER_SIZE`` bytes, read once."""
+        if self._header is None:
+            self._header = self.open().read(self.HEADER_SIZE)
+        return self._header
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def check_deadline(self, progress: str = "") -> None:
+        """
+        Cooperative cancellation point for long-running inspectors.
+
+        Call between members, pages or chunks; raises ``InspectionTimeout``
+        carrying ``progress`` (e.g. "12/400 members checked") once expired.
+        """
+        if self.expired():
+            raise InspectionTimeout(progress)
+
+    def stash_state(self, kind: str, state: Any) -> None:
+        """Leave ``state`` in ``STAGE_STATE`` for a later stage on this file."""
+        STAGE_STATE.put(self._state_key(kind), state)
+
+    def resume_state(self, kind: str) -> Optional[Any]:
+        """Take the state a previous stage stashed for this exact file version."""
+        return STAGE_STATE.take(self._state_key(kind))
+
+    def _state_key(self, kind: str) -> tuple:
+        stat_result = self.stat
+        return (
+            os.path.abspath(self.file_path),
+            stat_result.st_size,
+            stat_result.st_mtime_ns,
+            kind,
+        )
+
+    def open(self) -> BinaryIO:
+        """Return the shared binary handle, rewound to offset 0."""
+        if self._file is None:
+            self._file = open(self.file_path, "rb")
+        self._file.seek(0)
+        return self._file
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        if offset < self.HEADER_SIZE and offset + size <= len(self.header):
+            return self._header[offset : offset + size]
+        handle = self.open()
+        handle.seek(offset)
+        return handle.read(size)
+
+    def mmap(self) -> mmap.mmap:
+        """Read-only memory map of the whole file (raises ``ValueError`` if empty)."""
+        if self._mmap is None:
+            self._mmap = mmap.mmap(self.open().fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "FileContext":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+
+def check_deadline(context: Optional[FileContext], progress: str = "") -> None:
+    """``context.check_deadline`` that tolerates inspectors called without a context."""
+    if context is not None:
+        context.check_deadline(progress)
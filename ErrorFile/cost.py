@@ -0,0 +1,83 @@
+"""Per-file cost estimates used to schedule batch inspections largest-first."""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, Mapping, Optional
+
+from .Detection.FileInspector import LIGHTWEIGHT_MODES, _extension_candidates
+
+CostEstimator = Callable[[str, Optional[os.stat_result], str], float]
+
+# Relative deep-mode work per byte. Archives and Office formats decompress or
+# parse everything; media inspectors only read container headers.
+DEFAULT_COST_FACTORS: Dict[str, float] = {
+    ".pdf": 3.0,
+    ".7z": 4.0,
+    ".rar": 4.0,
+    ".zip": 2.0,
+    ".xlsx": 5.0,
+    ".xls": 3.0,
+    ".docx": 3.0,
+    ".pptx": 3.0,
+    ".tar": 1.0,
+    ".tar.gz": 2.5,
+    ".tar.bz2": 4.0,
+    ".tar.xz": 3.0,
+    ".gz": 1.5,
+    ".bz2": 3.0,
+    ".xz": 2.0,
+    ".jpg": 2.0,
+    ".jpeg": 2.0,
+    ".png": 2.0,
+    ".gif": 2.0,
+    ".bmp": 1.0,
+    ".webp": 2.0,
+    ".tiff": 2.0,
+    ".sqlite": 1.5,
+    ".db": 1.5,
+    ".mp3": 0.1,
+    ".mp4": 0.1,
+    ".flac": 0.1,
+    ".ogg": 0.1,
+    ".oga": 0.1,
+    ".wav": 0.1,
+}
+DEFAULT_COST_FACTOR = 1.0
+# Fast checks mostly read headers and directories, so size matters far less.
+MODE_SIZE_WEIGHTS = {"deep": 1.0, "fast": 0.1}
+# Fixed per-file cost (open, stat, parser setup) expressed in bytes.
+PER_FILE_OVERHEAD_BYTES = 64 * 1024
+
+
+def estimate_inspection_cost(
+    file_path: str,
+    stat_result: Optional[os.stat_result] = None,
+    mode: str = "deep",
+    cost_factors: Optional[Mapping[str, float]] = None,
+) -> float:
+    """
+    Estimate the relative cost of inspecting ``file_path`` in ``mode``.
+
+    The estimate is ``(size + overhead) * factor(extension) * weight(mode)``.
+    Only the ordering matters, not the unit. Files that cannot be stat'ed
+    cost 0 and are scheduled last, since they fail immediately.
+    """
+    if mode in LIGHTWEIGHT_MODES:
+        return 1.0
+    if stat_result is None:
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return 0.0
+    factors = DEFAULT_COST_FACTORS if cost_factors is None else cost_factors
+    factor = next(
+        (
+            factors[extension]
+            for extension in _extension_candidates(os.fspath(file_path).lower())
+            if extension in factors
+        ),
+        DEFAULT_COST_FACTOR,
+    )
+    weight = MODE_SIZE_WEIGHTS.get(mode, 1.0)
+    return (stat_result.st_size + PER_FILE_OVERHEAD_BYTES) * factor * weight
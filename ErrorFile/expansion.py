@@ -0,0 +1,134 @@
+"""Decompression-bomb screening from archive metadata, before anything is inflated."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from .report import TAG_EXPANSION_LIMIT, InspectionFinding, fail_finding
+
+
+@dataclass(frozen=True)
+class ExpansionLimits:
+    """
+    Limits on what an archive declares it expands to.
+
+    ``max_uncompressed_bytes`` caps the declared size of all members together
+    and ``max_entries`` their number. ``max_ratio`` caps uncompressed to
+    compressed size, for the whole archive and for each member; ratios only
+    count once the declared size reaches ``ratio_floor_bytes``, since small,
+    highly compressible files are harmless. ``max_overlapping_entries`` caps
+    ZIP members whose data overlaps another member's, the trick behind
+    non-recursive zip bombs. ``None`` disables a limit; by default only the
+    ratio is capped, so large but honest archives pass.
+
+    ``tar_byte_budget`` is not a failure limit: the deep tar check stops after
+    decompressing that many bytes and returns an OK report tagged partial.
+    """
+
+    max_uncompressed_bytes: Optional[int] = None
+    max_entries: Optional[int] = None
+    max_ratio: Optional[float] = 1000.0
+    ratio_floor_bytes: int = 64 << 20
+    max_overlapping_entries: Optional[int] = None
+    tar_byte_budget: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        for name in ("max_uncompressed_bytes", "max_entries", "max_ratio", "tar_byte_budget"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be > 0")
+        if self.ratio_floor_bytes < 0:
+            raise ValueError("ratio_floor_bytes must be >= 0")
+        if self.max_overlapping_entries is not None and self.max_overlapping_entries < 0:
+            raise ValueError("max_overlapping_entries must be >= 0")
+
+
+DEFAULT_EXPANSION_LIMITS = ExpansionLimits()
+
+
+def _format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size} bytes"
+    value = float(size)
+    for unit in ("KiB", "MiB", "GiB", "TiB"):
+        value /= 1024
+        if value < 1024:
+            break
+    return f"{value:.1f} {unit}"
+
+
+class ExpansionScreen:
+    """
+    Running totals for one archive, checked as member metadata is read.
+
+    ``add`` is called with each member's declared sizes and returns a
+    description of the first exceeded limit, so streaming formats can stop
+    at the offending header instead of inflating its data. An archive that
+    is not ``compressed`` (a plain tar) stores members at their full size and
+    cannot be a bomb, so only its entry count is screened.
+    """
+
+    def __init__(
+        self,
+        archive_bytes: int,
+        limits: Optional[ExpansionLimits] = None,
+        compressed: bool = True,
+    ):
+        self.archive_bytes = archive_bytes
+        self.limits = DEFAULT_EXPANSION_LIMITS if limits is None else limits
+        self.compressed = compressed
+        self.entries = 0
+        self.uncompressed_bytes = 0
+
+    @classmethod
+    def for_file(cls, file_path: str, context=None, compressed: bool = True) -> "ExpansionScreen":
+        """Screen sized by the file on disk, with the context's limits if any."""
+        if context is not None:
+            return cls(context.size, context.expansion_limits, compressed)
+        return cls(os.path.getsize(file_path), compressed=compressed)
+
+    def add(self, name: str, uncompressed: int, compressed: Optional[int] = None) -> Optional[str]:
+        limits = self.limits
+        self.entries += 1
+        self.uncompressed_bytes += uncompressed
+        if limits.max_entries is not None and self.entries > limits.max_entries:
+            return f"more than {limits.max_entries} entries"
+        if not self.compressed:
+            return None
+        if (
+            limits.max_uncompressed_bytes is not None
+            and self.uncompressed_bytes > limits.max_uncompressed_bytes
+        ):
+            return (
+                f"declares at least {_format_bytes(self.uncompressed_bytes)} uncompressed, "
+                f"limit is {_format_bytes(limits.max_uncompressed_bytes)}"
+            )
+        if limits.max_ratio is None:
+            return None
+        if compressed is not None and uncompressed >= limits.ratio_floor_bytes:
+            ratio = uncompressed / max(compressed, 1)
+            if ratio > limits.max_ratio:
+                return (
+                    f"member '{name}' expands {ratio:.0f}:1, "
+                    f"limit is {limits.max_ratio:.0f}:1"
+                )
+        if self.uncompressed_bytes >= limits.ratio_floor_bytes:
+            ratio = self.uncompressed_bytes / max(self.archive_bytes, 1)
+            if ratio > limits.max_ratio:
+                return f"archive expands over {ratio:.0f}:1, limit is {limits.max_ratio:.0f}:1"
+        return None
+
+    def check_overlaps(self, overlapping_entries: int) -> Optional[str]:
+        limit = self.limits.max_overlapping_entries
+        if limit is not None and overlapping_entries > limit:
+            return f"{overlapping_entries} entries overlap another entry's data"
+        return None
+
+
+def expansion_finding(problem: str) -> InspectionFinding:
+    return fail_finding(
+        f"Archive exceeds expansion limits: {problem}; not decompressed.",
+        TAG_EXPANSION_LIMIT,
+    )
@@ -0,0 +1,44 @@
+"""Content fingerprints used to share results between byte-identical files."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Optional, Tuple
+
+FINGERPRINT_FULL = "full"
+FINGERPRINT_SAMPLED = "sampled"
+SUPPORTED_FINGERPRINT_STRATEGIES = {FINGERPRINT_FULL, FINGERPRINT_SAMPLED}
+
+_READ_CHUNK_SIZE = 1024 * 1024
+_SAMPLE_SIZE = 64 * 1024
+
+Fingerprint = Tuple[int, str]
+
+
+def file_fingerprint(
+    file_path: str,
+    strategy: str = FINGERPRINT_FULL,
+    stat_result: Optional[os.stat_result] = None,
+) -> Fingerprint:
+    """
+    Return ``(size, blake2b hexdigest)`` for ``file_path``.
+
+    ``full`` hashes every byte. ``sampled`` only hashes the head, middle and
+    tail 64 KiB of large files: much cheaper, but two files that differ only
+    outside the sampled windows get the same fingerprint.
+    """
+    if strategy not in SUPPORTED_FINGERPRINT_STRATEGIES:
+        raise ValueError("Unsupported fingerprint strategy; allowed: full, sampled")
+
+    size = (stat_result if stat_result is not None else os.stat(file_path)).st_size
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as file:
+        if strategy == FINGERPRINT_SAMPLED and size > 3 * _SAMPLE_SIZE:
+            for offset in (0, (size - _SAMPLE_SIZE) // 2, size - _SAMPLE_SIZE):
+                file.seek(offset)
+                digest.update(file.read(_SAMPLE_SIZE))
+        else:
+            for chunk in iter(lambda: file.read(_READ_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return size, digest.hexdigest()
@@ -0,0 +1,96 @@
+"""Multi-stage inspection: per-extension stage plans run as a pipeline."""
+
+from __future__ import annotations
+
+import os
+import queue
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .Detection.FileInspector import _extension_candidates, normalize_mode
+from .report import InspectionReport
+
+StagePlan = Tuple[str, ...]
+StageSubmitter = Callable[[str, Optional[os.stat_result], str, bool], Future]
+
+
+def normalize_stage_plans(
+    stage_plans: Mapping[str, Iterable[str]], final_mode: str
+) -> Dict[str, StagePlan]:
+    """
+    Validate ``{extension: modes}`` plans against the batch's ``final_mode``.
+
+    Extensions are lower-cased and dotted, modes normalized (``precise`` ->
+    ``deep``) and repeated stages collapsed. Every plan must end with
+    ``final_mode`` so each file gets a report of the mode that was asked for.
+    """
+    normalized = {}
+    for extension, modes in stage_plans.items():
+        extension = extension.lower()
+        if not extension.startswith("."):
+            extension = f".{extension}"
+        plan: List[str] = []
+        for mode in modes:
+            mode = normalize_mode(mode)
+            if not plan or plan[-1] != mode:
+                plan.append(mode)
+        if not plan or plan[-1] != final_mode:
+            raise ValueError(f"Stage plan for {extension} must end with mode {final_mode}")
+        normalized[extension] = tuple(plan)
+    return normalized
+
+
+def stage_plan_for(path: str, plans: Mapping[str, StagePlan], default_plan: StagePlan) -> StagePlan:
+    """Plan of the longest matching extension (``.tar.gz`` before ``.gz``)."""
+    for extension in _extension_candidates(path.lower()):
+        plan = plans.get(extension)
+        if plan is not None:
+            return plan
+    return default_plan
+
+
+def with_first_stage(plan: StagePlan, mode: str) -> StagePlan:
+    return plan if plan[0] == mode else (mode, *plan)
+
+
+def run_pipeline(
+    tasks: Sequence[Tuple[str, Optional[os.stat_result]]],
+    plans: Mapping[str, StagePlan],
+    submit_stage: StageSubmitter,
+    signature_precheck: bool = True,
+) -> Dict[str, InspectionReport]:
+    """
+    Run every path through its stage plan and return the last report of each.
+
+    All first stages are submitted up front, in ``tasks`` order. As soon as a
+    stage finishes, a passing file is submitted to its next stage and a
+    failing one drops out, so no stage waits for the rest of the batch.
+    ``submit_stage(path, stat_result, mode, signature_precheck)`` picks the
+    pool for each stage; completions come back through a queue and the next
+    stage is submitted from the calling thread, never from a pool callback.
+    Every stage gets the same ``signature_precheck`` so its report lands
+    under the same cache key as an unstaged inspection of that mode; the
+    repeated precheck only re-reads the file header.
+    """
+    completed: "queue.SimpleQueue" = queue.SimpleQueue()
+    reports: Dict[str, InspectionReport] = {}
+
+    def _submit(path, stat_result, index):
+        future = submit_stage(path, stat_result, plans[path][index], signature_precheck)
+        future.add_done_callback(
+            lambda done: completed.put((path, stat_result, index, done))
+        )
+
+    for path, stat_result in tasks:
+        _submit(path, stat_result, 0)
+
+    remaining = len(tasks)
+    while remaining:
+        path, stat_result, index, future = completed.get()
+        report = future.result()
+        if report.ok and index + 1 < len(plans[path]):
+            _submit(path, stat_result, index + 1)
+            continue
+        reports[path] = report
+        remaining -= 1
+    return reports
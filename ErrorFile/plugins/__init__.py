@@ -1,6 +1,25 @@
 """Plugin registration for ErrorFile inspectors."""
 
-from .base import InspectorCallable
+from .base import (
+    COST_CLASS_CPU,
+    COST_CLASS_IO,
+    InspectorCallable,
+    accepts_file_context,
+    get_cost_class,
+    set_cost_class,
+    uses_file_context,
+)
 from .defaults import load_default_plugins
+from .registry import LazyInspectorRegistry
 
-__all__ = ["InspectorCallable", "load_default_plugins"]
+__all__ = [
+    "COST_CLASS_CPU",
+    "COST_CLASS_IO",
+    "InspectorCallable",
+    "LazyInspectorRegistry",
+    "accepts_file_context",
+    "get_cost_class",
+    "load_default_plugins",
+    "set_cost_class",
+    "uses_file_context",
+]
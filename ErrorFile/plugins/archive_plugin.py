@@ -1,18 +1,39 @@
 from typing import Dict
 
-from .base import InspectorCallable
-from ..Detection.ArchiveInspector import (
-    check_7z_file,
-    check_bzip2_file,
-    check_gzip_file,
-    check_rar_file,
-    check_tar_file,
-    check_xz_file,
-    check_zip_file,
+from .base import COST_CLASS_CPU, InspectorCallable, set_cost_class, uses_file_context
+
+EXTENSIONS = (
+    ".zip",
+    ".rar",
+    ".7z",
+    ".tar",
+    ".tar.gz",
+    ".tar.bz2",
+    ".tar.xz",
+    ".gz",
+    ".bz2",
+    ".xz",
 )
 
 
 def register(registry: Dict[str, InspectorCallable]) -> None:
+    from ..Detection.ArchiveInspector import (
+        check_7z_file,
+        check_bzip2_file,
+        check_gzip_file,
+        check_rar_file,
+        check_tar_file,
+        check_xz_file,
+        check_zip_file,
+    )
+
+    stream_inspectors = (check_gzip_file, check_bzip2_file, check_xz_file)
+    for inspector in (check_zip_file, check_7z_file, check_tar_file, *stream_inspectors):
+        # Deep checks decompress every member or the whole stream; RAR testing
+        # runs in an external tool.
+        set_cost_class(inspector, deep=COST_CLASS_CPU)
+        # The member and stream loops check the context's deadline and expansion limits.
+        uses_file_context(inspector)
     registry[".zip"] = check_zip_file
     registry[".rar"] = check_rar_file
     registry[".7z"] = check_7z_file
@@ -3,3 +3,39 @@ from typing import Callable
 from ..report import InspectionFinding
 
 InspectorCallable = Callable[[str, str], InspectionFinding]
+
+# Cost classes drive hybrid scheduling: "io" inspectors mostly wait on the
+# disk or release the GIL and run on threads, "cpu" inspectors hold the GIL
+# while parsing/decoding and run on processes.
+COST_CLASS_IO = "io"
+COST_CLASS_CPU = "cpu"
+
+
+def set_cost_class(
+    inspector: InspectorCallable,
+    deep: str = COST_CLASS_IO,
+    fast: str = COST_CLASS_IO,
+) -> InspectorCallable:
+    """Declare the per-mode cost class of an inspector."""
+    inspector.cost_classes = {"fast": fast, "deep": deep}
+    return inspector
+
+
+def get_cost_class(inspector: InspectorCallable, mode: str) -> str:
+    cost_classes = getattr(inspector, "cost_classes", None) or {}
+    return cost_classes.get(mode, COST_CLASS_IO)
+
+
+def uses_file_context(inspector: InspectorCallable) -> InspectorCallable:
+    """
+    Opt an inspector in to receiving the shared ``FileContext``.
+
+    Such inspectors are called as ``inspector(path, mode, context=context)``
+    and should read the header/handle from the context instead of reopening.
+    """
+    inspector.accepts_context = True
+    return inspector
+
+
+def accepts_file_context(inspector: InspectorCallable) -> bool:
+    return bool(getattr(inspector, "accepts_context", False))
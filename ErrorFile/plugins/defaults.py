@@ -18,6 +18,27 @@ def _is_internal_import_error(exc: Exception) -> bool:
     return bool(missing_name and missing_name.startswith("ErrorFile"))
 
 
+def register_plugin_module(
+    module_path: str,
+    registry: Dict[str, InspectorCallable],
+) -> bool:
+    """
+    Import ``module_path`` and run its ``register``; False if a dependency is missing.
+
+    Plugins import their third-party dependencies inside ``register()``, so
+    missing packages surface there as well as at module import.
+    """
+    try:
+        module = import_module(module_path)
+        register = getattr(module, "register")
+        register(registry)
+    except ImportError as exc:
+        if _is_internal_import_error(exc):
+            raise
+        return False
+    return True
+
+
 def load_default_plugins(
     registry: Dict[str, InspectorCallable],
     plugin_modules: Iterable[str] = DEFAULT_PLUGIN_MODULES,
@@ -26,22 +47,10 @@ def load_default_plugins(
     skipped_modules: List[str] = []
 
     for module_path in plugin_modules:
-        try:
-            module = import_module(module_path)
-        except ModuleNotFoundError as exc:
-            if _is_internal_import_error(exc):
-                raise
+        if register_plugin_module(module_path, registry):
+            loaded_modules.append(module_path)
+        else:
             skipped_modules.append(module_path)
-            continue
-        except ImportError as exc:
-            if _is_internal_import_error(exc):
-                raise
-            skipped_modules.append(module_path)
-            continue
-
-        register = getattr(module, "register")
-        register(registry)
-        loaded_modules.append(module_path)
 
     load_default_plugins.last_loaded_modules = tuple(loaded_modules)
     load_default_plugins.last_skipped_modules = tuple(skipped_modules)
@@ -1,7 +1,6 @@
 from typing import Dict
 
-from .base import InspectorCallable
-from ..Detection.ImageInspector_precise import ImageInspector as ImageInspectorPrecise
+from .base import COST_CLASS_CPU, InspectorCallable, set_cost_class, uses_file_context
 from ..report import (
     TAG_CORRUPTED,
     TAG_INVALID_FORMAT,
@@ -10,9 +9,15 @@ from ..report import (
     ok_finding,
 )
 
+IMAGE_EXTENSIONS = (".jpeg", ".jpg", ".png", ".gif", ".bmp", ".webp", ".tiff")
+EXTENSIONS = IMAGE_EXTENSIONS + (".svg",)
 
-def _inspect_image(file_path: str, mode: str):
-    inspector = ImageInspectorPrecise(file_path)
+
+@uses_file_context
+def _inspect_image(file_path: str, mode: str, context=None):
+    from ..Detection.ImageInspector_precise import ImageInspector as ImageInspectorPrecise
+
+    inspector = ImageInspectorPrecise(file_path, context=context)
     return inspector.check_image(mode)
 
 
@@ -36,7 +41,10 @@ def _inspect_svg(file_path: str, _: str):
 
 
 def register(registry: Dict[str, InspectorCallable]) -> None:
-    image_extensions = (".jpeg", ".jpg", ".png", ".gif", ".bmp", ".webp", ".tiff")
-    for extension in image_extensions:
+    # Import up front so a missing Pillow skips the plugin at registration.
+    from ..Detection.ImageInspector_precise import ImageInspector  # noqa: F401
+
+    set_cost_class(_inspect_image, deep=COST_CLASS_CPU)
+    for extension in IMAGE_EXTENSIONS:
         registry[extension] = _inspect_image
     registry[".svg"] = _inspect_svg
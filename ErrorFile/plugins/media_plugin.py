@@ -1,10 +1,11 @@
 from typing import Dict
 
 from .base import InspectorCallable
-from ..Detection.MediaInspector import check_media_file
 
+EXTENSIONS = (".mp3", ".mp4", ".flac", ".ogg", ".oga", ".wav")
 
-def _wrap_media(extension: str):
+
+def _wrap_media(check_media_file, extension: str):
     def _wrapped(file_path: str, mode: str):
         return check_media_file(file_path, extension, mode)
 
@@ -12,9 +13,11 @@ def _wrap_media(extension: str):
 
 
 def register(registry: Dict[str, InspectorCallable]) -> None:
-    registry[".mp3"] = _wrap_media(".mp3")
-    registry[".mp4"] = _wrap_media(".mp4")
-    registry[".flac"] = _wrap_media(".flac")
-    registry[".ogg"] = _wrap_media(".ogg")
-    registry[".oga"] = _wrap_media(".ogg")
-    registry[".wav"] = _wrap_media(".wav")
+    from ..Detection.MediaInspector import check_media_file
+
+    registry[".mp3"] = _wrap_media(check_media_file, ".mp3")
+    registry[".mp4"] = _wrap_media(check_media_file, ".mp4")
+    registry[".flac"] = _wrap_media(check_media_file, ".flac")
+    registry[".ogg"] = _wrap_media(check_media_file, ".ogg")
+    registry[".oga"] = _wrap_media(check_media_file, ".ogg")
+    registry[".wav"] = _wrap_media(check_media_file, ".wav")
@@ -1,12 +1,21 @@
 from typing import Dict
 
-from .base import InspectorCallable
-from ..Detection.ExcelInspector import check_excel_file, check_xls_file
-from ..Detection.PowerPointInspector import check_pptx_file
-from ..Detection.WordInspector import check_docx_file
+from .base import COST_CLASS_CPU, InspectorCallable, set_cost_class, uses_file_context
+
+EXTENSIONS = (".xlsx", ".xls", ".docx", ".pptx")
 
 
 def register(registry: Dict[str, InspectorCallable]) -> None:
+    from ..Detection.ExcelInspector import check_excel_file, check_xls_file
+    from ..Detection.PowerPointInspector import check_pptx_file
+    from ..Detection.WordInspector import check_docx_file
+
+    for inspector in (check_excel_file, check_docx_file, check_pptx_file):
+        set_cost_class(inspector, deep=COST_CLASS_CPU)
+        # Expansion screening maps the container through the context.
+        uses_file_context(inspector)
+    # xlrd parses the whole workbook in both modes.
+    set_cost_class(check_xls_file, deep=COST_CLASS_CPU, fast=COST_CLASS_CPU)
     registry[".xlsx"] = check_excel_file
     registry[".xls"] = check_xls_file
     registry[".docx"] = check_docx_file
@@ -1,13 +1,21 @@
 from typing import Dict
 
-from .base import InspectorCallable
-from ..Detection.PDFInspector import PDFInspector
+from .base import COST_CLASS_CPU, InspectorCallable, set_cost_class, uses_file_context
 
+EXTENSIONS = (".pdf",)
 
-def _inspect_pdf(file_path: str, mode: str):
-    inspector = PDFInspector(file_path)
+
+@uses_file_context
+def _inspect_pdf(file_path: str, mode: str, context=None):
+    from ..Detection.PDFInspector import PDFInspector
+
+    inspector = PDFInspector(file_path, context=context)
     return inspector.check_pdf(mode)
 
 
 def register(registry: Dict[str, InspectorCallable]) -> None:
+    # Import up front so a missing PyPDF2 skips the plugin at registration.
+    from ..Detection.PDFInspector import PDFInspector  # noqa: F401
+
+    set_cost_class(_inspect_pdf, deep=COST_CLASS_CPU)
     registry[".pdf"] = _inspect_pdf
@@ -0,0 +1,109 @@
+"""Extension registry that imports plugin dependencies on first lookup."""
+
+import threading
+from collections.abc import MutableMapping
+from importlib import import_module
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .base import InspectorCallable
+from .defaults import DEFAULT_PLUGIN_MODULES, register_plugin_module
+
+
+class LazyInspectorRegistry(MutableMapping):
+    """
+    Mapping of extension -> inspector whose plugins register on first use.
+
+    Every plugin module declares ``EXTENSIONS`` and keeps its Detection
+    imports inside ``register()``, so building the registry only imports the
+    thin plugin modules. Looking up a declared extension runs that plugin's
+    ``register()`` (and with it PIL, PyPDF2, openpyxl, ...); membership tests,
+    iteration and ``keys()`` never do. Entries set explicitly always win over
+    what a plugin registers later for the same extension.
+    """
+
+    def __init__(self, plugin_modules: Iterable[str] = DEFAULT_PLUGIN_MODULES):
+        self._inspectors: Dict[str, InspectorCallable] = {}
+        self._pending: Dict[str, str] = {}
+        self._plugin_modules: Tuple[str, ...] = tuple(plugin_modules)
+        self._loaded: List[str] = []
+        self._skipped: List[str] = []
+        self._lock = threading.RLock()
+        for module_path in self._plugin_modules:
+            module = import_module(module_path)
+            for extension in getattr(module, "EXTENSIONS", ()):
+                self._pending.setdefault(extension, module_path)
+
+    @property
+    def loaded_modules(self) -> Tuple[str, ...]:
+        return tuple(self._loaded)
+
+    @property
+    def skipped_modules(self) -> Tuple[str, ...]:
+        return tuple(self._skipped)
+
+    def load_plugin(self, module_path: str) -> bool:
+        """Register ``module_path`` now; return False if its dependencies are missing."""
+        with self._lock:
+            if module_path in self._loaded:
+                return True
+            if module_path in self._skipped:
+                return False
+            staged: Dict[str, InspectorCallable] = {}
+            loaded = register_plugin_module(module_path, staged)
+            declared = [ext for ext, owner in self._pending.items() if owner == module_path]
+            if loaded:
+                for extension, inspector in staged.items():
+                    # Only fill extensions nobody has overridden in the meantime.
+                    if extension in declared or extension not in self._inspectors:
+                        self._inspectors[extension] = inspector
+            # Drop pending entries last so lock-free lookups never see a gap.
+            for extension in declared:
+                del self._pending[extension]
+            (self._loaded if loaded else self._skipped).append(module_path)
+            return loaded
+
+    def load_all(self) -> None:
+        for module_path in self._plugin_modules:
+            self.load_plugin(module_path)
+
+    def _resolve(self, extension: str) -> Optional[InspectorCallable]:
+        inspector = self._inspectors.get(extension)
+        if inspector is not None:
+            return inspector
+        module_path = self._pending.get(extension)
+        if module_path is None:
+            return None
+        self.load_plugin(module_path)
+        return self._inspectors.get(extension)
+
+    def __getitem__(self, extension: str) -> InspectorCallable:
+        inspector = self._resolve(extension)
+        if inspector is None:
+            raise KeyError(extension)
+        return inspector
+
+    def get(self, extension: str, default=None):
+        inspector = self._resolve(extension)
+        return default if inspector is None else inspector
+
+    def __setitem__(self, extension: str, inspector: InspectorCallable) -> None:
+        with self._lock:
+            self._pending.pop(extension, None)
+            self._inspectors[extension] = inspector
+
+    def __delitem__(self, extension: str) -> None:
+        with self._lock:
+            found = self._inspectors.pop(extension, None) is not None
+            found = self._pending.pop(extension, None) is not None or found
+        if not found:
+            raise KeyError(extension)
+
+    def __contains__(self, extension) -> bool:
+        return extension in self._inspectors or extension in self._pending
+
+    def __iter__(self) -> Iterator[str]:
+        # Explicit entries and pending declarations never share a key.
+        return iter(list(self._inspectors) + list(self._pending))
+
+    def __len__(self) -> int:
+        return len(self._inspectors) + len(self._pending)
@@ -1,25 +1,60 @@
 from typing import Dict
 
-from .base import InspectorCallable
-from ..Detection.TextInspector import (
-    check_csv_file,
-    check_eml_file,
-    check_html_file,
-    check_ini_file,
-    check_json_file,
-    check_msg_file,
-    check_ndjson_file,
-    check_plain_text_file,
-    check_rtf_file,
-    check_sqlite_file,
-    check_toml_file,
-    check_tsv_file,
-    check_xml_file,
-    check_yaml_file,
+from .base import InspectorCallable, uses_file_context
+
+EXTENSIONS = (
+    ".json",
+    ".ndjson",
+    ".xml",
+    ".toml",
+    ".yaml",
+    ".yml",
+    ".tsv",
+    ".rtf",
+    ".eml",
+    ".msg",
+    ".sqlite",
+    ".db",
+    ".txt",
+    ".md",
+    ".log",
+    ".csv",
+    ".html",
+    ".htm",
+    ".ini",
+    ".cfg",
 )
 
 
 def register(registry: Dict[str, InspectorCallable]) -> None:
+    from ..Detection.TextInspector import (
+        check_csv_file,
+        check_eml_file,
+        check_html_file,
+        check_ini_file,
+        check_json_file,
+        check_msg_file,
+        check_ndjson_file,
+        check_plain_text_file,
+        check_rtf_file,
+        check_sqlite_file,
+        check_toml_file,
+        check_tsv_file,
+        check_xml_file,
+        check_yaml_file,
+    )
+
+    for inspector in (
+        check_eml_file,
+        check_html_file,
+        check_msg_file,
+        check_plain_text_file,
+        check_rtf_file,
+        check_sqlite_file,
+        check_toml_file,
+        check_yaml_file,
+    ):
+        uses_file_context(inspector)
     registry[".json"] = check_json_file
     registry[".ndjson"] = check_ndjson_file
     registry[".xml"] = check_xml_file
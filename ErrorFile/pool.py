@@ -0,0 +1,131 @@
+"""Long-lived worker pools shared across batch inspection calls."""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Optional
+
+from .sandbox import SandboxedProcessPool, SandboxLimits, inspection_failure_reports
+
+
+def _warm_worker() -> None:
+    # Plugins register lazily; warm them all so no task pays for importing
+    # PIL, PyPDF2, openpyxl, py7zr, mutagen, ... on its first lookup.
+    from .Detection.FileInspector import warm_plugins
+
+    warm_plugins()
+
+
+def _noop() -> None:
+    return None
+
+
+class InspectionPool:
+    """
+    Reusable executor for ``inspect_files``, ``iter_inspect_files`` and ``inspect_tree``.
+
+    Process workers preload the inspector plugins in their initializer, so
+    batches submitted later reuse warm workers instead of paying fork/spawn
+    and import costs on every call. With ``recycle_after`` set, the workers
+    are replaced once that many tasks have been submitted; the retiring
+    workers finish their queued tasks first.
+
+    With ``sandbox`` set, workers run under those ``SandboxLimits``: a file
+    that exceeds them gets a ``resource_limit`` report, its worker is
+    replaced and the rest of the batch carries on. Sandboxed batches send
+    one file per task so the offending file is always known.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        use_processes: bool = True,
+        recycle_after: Optional[int] = None,
+        preload_plugins: bool = True,
+        sandbox: Optional[SandboxLimits] = None,
+    ):
+        if workers is not None and workers <= 0:
+            raise ValueError("workers must be > 0")
+        if recycle_after is not None and recycle_after <= 0:
+            raise ValueError("recycle_after must be > 0")
+        if sandbox is not None and not use_processes:
+            raise ValueError("sandbox requires use_processes=True")
+        self.workers = workers
+        self.use_processes = use_processes
+        self.recycle_after = recycle_after
+        self.preload_plugins = preload_plugins
+        self.sandbox = sandbox
+        self._lock = threading.Lock()
+        self._executor = None
+        self._submitted = 0
+        self._closed = False
+
+    def start(self) -> "InspectionPool":
+        """Spawn and warm every worker now instead of on the first batch."""
+        with self._lock:
+            executor = self._current_executor()
+        worker_count = self.workers or os.cpu_count() or 1
+        wait([executor.submit(_noop) for _ in range(worker_count)])
+        return self
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            executor = self._current_executor()
+            if self.recycle_after is not None and self._submitted >= self.recycle_after:
+                executor.shutdown(wait=False)
+                executor = self._executor = self._create_executor()
+                self._submitted = 0
+            self._submitted += 1
+            return executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def inspect_files(self, file_paths: Iterable[str], **kwargs: Any):
+        from . import inspect_files
+
+        return inspect_files(file_paths, pool=self, **kwargs)
+
+    def iter_inspect_files(self, file_paths: Iterable[str], **kwargs: Any):
+        from . import iter_inspect_files
+
+        return iter_inspect_files(file_paths, pool=self, **kwargs)
+
+    def inspect_tree(self, root: str, **kwargs: Any):
+        from . import inspect_tree
+
+        return inspect_tree(root, pool=self, **kwargs)
+
+    def __enter__(self) -> "InspectionPool":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.shutdown()
+
+    def _current_executor(self):
+        if self._closed:
+            raise RuntimeError("InspectionPool has been shut down")
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    def _create_executor(self):
+        if not self.use_processes:
+            return ThreadPoolExecutor(max_workers=self.workers)
+        if self.sandbox is not None:
+            return SandboxedProcessPool(
+                max_workers=self.workers,
+                limits=self.sandbox,
+                preload_plugins=self.preload_plugins,
+                on_failure=inspection_failure_reports,
+            )
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_warm_worker if self.preload_plugins else None,
+        )
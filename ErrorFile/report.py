@@ -13,6 +13,9 @@ TAG_NOT_FOUND = "not_found"
 TAG_UNKNOWN_ERROR = "unknown_error"
 TAG_PARTIAL = "partial"
 TAG_INVALID_MODE = "invalid_mode"
+TAG_TIMEOUT = "timeout"
+TAG_RESOURCE_LIMIT = "resource_limit"
+TAG_EXPANSION_LIMIT = "expansion_limit"
 
 
 @dataclass(frozen=True)
@@ -34,6 +37,11 @@ class InspectionReport:
     error: Optional[str] = None
     cache_hit: bool = False
     duration_ms: Optional[float] = None
+    reused_from: Optional[str] = None
+    declared_type: Optional[str] = None
+    detected_type: Optional[str] = None
+    # Set when a cached report of a stronger mode answered this one (e.g. "deep").
+    satisfied_by: Optional[str] = None
 
     def __iter__(self):
         yield self.ok
@@ -45,6 +53,12 @@ class InspectionReport:
     def with_duration(self, duration_ms: float) -> "InspectionReport":
         return replace(self, duration_ms=duration_ms)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InspectionReport":
+        values = dict(data)
+        values["tags"] = tuple(values.get("tags") or ())
+        return cls(**values)
+
     def as_dict(self) -> Dict[str, Any]:
         return {
             "file_path": self.file_path,
@@ -56,6 +70,10 @@ class InspectionReport:
             "error": self.error,
             "cache_hit": self.cache_hit,
             "duration_ms": self.duration_ms,
+            "reused_from": self.reused_from,
+            "declared_type": self.declared_type,
+            "detected_type": self.detected_type,
+            "satisfied_by": self.satisfied_by,
         }
 
 
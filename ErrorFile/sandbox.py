@@ -0,0 +1,317 @@
+"""Process pool whose workers run under memory, CPU and wall-clock limits."""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from concurrent.futures import Executor, Future
+from multiprocessing.connection import wait
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from .report import TAG_RESOURCE_LIMIT, InspectionReport
+
+
+class ResourceLimitExceeded(RuntimeError):
+    """A sandboxed task's worker was killed or died; the message says why."""
+
+
+@dataclass(frozen=True)
+class SandboxLimits:
+    """
+    Per-worker limits for ``SandboxedProcessPool``.
+
+    ``memory_bytes`` caps the worker's address space (RLIMIT_AS) and
+    ``cpu_seconds`` the CPU time of each task (RLIMIT_CPU). ``wall_seconds``
+    is enforced by the parent, which kills workers that run a task longer.
+    """
+
+    memory_bytes: Optional[int] = None
+    cpu_seconds: Optional[int] = None
+    wall_seconds: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        for name in ("memory_bytes", "cpu_seconds", "wall_seconds"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} must be > 0")
+
+
+def _set_soft_limit(limit: int, soft: int) -> None:
+    _, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(limit, (soft, hard))
+
+
+def _arm_cpu_limit(cpu_seconds: int) -> None:
+    # RLIMIT_CPU counts the worker's whole lifetime, so move the soft limit
+    # forward before every task; SIGXCPU then kills the worker mid-task.
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = math.ceil(usage.ru_utime + usage.ru_stime)
+    _set_soft_limit(resource.RLIMIT_CPU, used + cpu_seconds)
+
+
+def _worker_main(conn, limits: SandboxLimits, preload_plugins: bool) -> None:
+    if resource is not None:
+        # A worker killed by SIGXCPU must not leave a core file behind.
+        resource.setrlimit(resource.RLIMIT_CORE, (0, resource.getrlimit(resource.RLIMIT_CORE)[1]))
+    if limits.memory_bytes is not None:
+        _set_soft_limit(resource.RLIMIT_AS, limits.memory_bytes)
+    if preload_plugins:
+        from .Detection.FileInspector import warm_plugins
+
+        warm_plugins()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args, kwargs = task
+        if limits.cpu_seconds is not None:
+            _arm_cpu_limit(limits.cpu_seconds)
+        try:
+            outcome = (True, fn(*args, **kwargs))
+        except BaseException as exc:
+            outcome = (False, exc)
+        try:
+            conn.send(outcome)
+        except Exception as exc:
+            conn.send((False, RuntimeError(f"Task result could not be sent: {exc}")))
+
+
+def _exit_reason(exitcode: Optional[int]) -> str:
+    if exitcode is not None and exitcode < 0:
+        signum = -exitcode
+        if signum == getattr(signal, "SIGXCPU", None):
+            return "worker exceeded the CPU time limit"
+        try:
+            name = signal.Signals(signum).name
+        except ValueError:
+            name = str(signum)
+        return f"worker was killed by {name}"
+    return f"worker exited unexpectedly (exit code {exitcode})"
+
+
+_TIMED_OUT = "timed_out"
+_DIED = "died"
+
+
+class _Worker:
+    """One sandboxed process and the pipe used to talk to it."""
+
+    def __init__(self, mp_context, limits: SandboxLimits, preload_plugins: bool):
+        self.conn, child_conn = mp_context.Pipe()
+        self.process = mp_context.Process(
+            target=_worker_main,
+            args=(child_conn, limits, preload_plugins),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def run(self, task, wall_seconds: Optional[float]):
+        """Return ``(ok, value)``, ``_TIMED_OUT`` or ``_DIED``."""
+        self.conn.send(task)
+        # Also wait on the process sentinel: EOF alone is not enough if a
+        # copy of the child's end of the pipe leaked into another process.
+        if not wait([self.conn, self.process.sentinel], wall_seconds):
+            return _TIMED_OUT
+        if not self.conn.poll():
+            return _DIED
+        try:
+            return self.conn.recv()
+        except EOFError:
+            return _DIED
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        self.conn.close()
+
+
+FailureHandler = Callable[[Callable[..., Any], tuple, dict, str], Any]
+
+
+class SandboxedProcessPool(Executor):
+    """
+    ``Executor`` that runs every task in a resource-limited worker process.
+
+    Each of the ``max_workers`` slots owns one worker. When a task exceeds a
+    limit, or its worker crashes, only that worker is killed and replaced;
+    the task's future gets ``on_failure(fn, args, kwargs, reason)`` (or a
+    ``ResourceLimitExceeded`` without a handler) and the other slots keep
+    going, so a hostile file cannot break the pool the way it breaks a
+    ``ProcessPoolExecutor``.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        limits: SandboxLimits = SandboxLimits(),
+        preload_plugins: bool = True,
+        on_failure: Optional[FailureHandler] = None,
+    ):
+        if resource is None and (limits.memory_bytes or limits.cpu_seconds):
+            raise RuntimeError("Memory and CPU limits need the POSIX resource module")
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be > 0")
+        self.limits = limits
+        self.preload_plugins = preload_plugins
+        self.on_failure = on_failure
+        self._mp_context = multiprocessing.get_context()
+        self._tasks: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._shutdown_lock = threading.Lock()
+        self._shutdown = False
+        # Fork one worker at a time so no worker inherits another's pipe end.
+        self._spawn_lock = threading.Lock()
+        self._slots: List[threading.Thread] = []
+        for index in range(max_workers or os.cpu_count() or 1):
+            slot = threading.Thread(
+                target=self._run_slot, name=f"sandbox-slot-{index}", daemon=True
+            )
+            slot.start()
+            self._slots.append(slot)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        with self._shutdown_lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future: Future = Future()
+            self._tasks.put((future, fn, args, kwargs))
+            return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._shutdown_lock:
+            if not self._shutdown:
+                self._shutdown = True
+                if cancel_futures:
+                    self._cancel_queued()
+                for _ in self._slots:
+                    self._tasks.put(None)
+        if wait:
+            for slot in self._slots:
+                slot.join()
+
+    def _cancel_queued(self) -> None:
+        while True:
+            try:
+                item = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[0].cancel()
+
+    def _spawn(self) -> _Worker:
+        with self._spawn_lock:
+            return _Worker(self._mp_context, self.limits, self.preload_plugins)
+
+    def _run_slot(self) -> None:
+        worker = None
+        try:
+            while True:
+                item = self._tasks.get()
+                if item is None:
+                    return
+                future, fn, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if worker is None or not worker.process.is_alive():
+                    # Never blame a task on a worker that died while idle.
+                    if worker is not None:
+                        worker.kill()
+                    worker = self._spawn()
+                try:
+                    outcome = worker.run((fn, args, kwargs), self.limits.wall_seconds)
+                except Exception as exc:
+                    # The task itself could not be pickled; the worker is fine.
+                    future.set_exception(exc)
+                    continue
+                if outcome in (_TIMED_OUT, _DIED):
+                    reason = self._kill_reason(worker, outcome is _TIMED_OUT)
+                    # Replace the worker now so it warms up before the next task.
+                    worker = self._spawn()
+                    self._fail(future, fn, args, kwargs, reason)
+                    continue
+                ok, value = outcome
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        finally:
+            if worker is not None:
+                worker.stop()
+
+    def _kill_reason(self, worker: _Worker, timed_out: bool) -> str:
+        if timed_out:
+            worker.kill()
+            return f"worker exceeded the {self.limits.wall_seconds}s wall-clock limit"
+        # The pipe closes before the process can be reaped; wait for the exit code.
+        worker.process.join()
+        worker.conn.close()
+        return _exit_reason(worker.process.exitcode)
+
+    def _fail(self, future: Future, fn, args, kwargs, reason: str) -> None:
+        if self.on_failure is None:
+            future.set_exception(ResourceLimitExceeded(reason))
+            return
+        try:
+            future.set_result(self.on_failure(fn, args, kwargs, reason))
+        except Exception as exc:
+            future.set_exception(exc)
+
+
+def resource_limit_report(file_path: str, mode: str, reason: str) -> InspectionReport:
+    """Report for a file whose sandboxed worker was killed or died."""
+    abs_path = os.path.abspath(file_path)
+    return InspectionReport(
+        file_path=abs_path,
+        extension=os.path.splitext(abs_path)[-1].lower(),
+        mode=mode,
+        ok=False,
+        message=f"Inspection aborted: {reason}.",
+        tags=(TAG_RESOURCE_LIMIT,),
+        error=reason,
+    )
+
+
+def inspection_failure_reports(fn, args: tuple, kwargs: dict, reason: str):
+    """
+    ``on_failure`` handler used by ``InspectionPool``: turn a killed task into
+    the reports its caller expects instead of an exception.
+    """
+    from . import _inspect_chunk, inspect_file_report
+    from .Detection.FileInspector import normalize_mode
+
+    if fn is inspect_file_report:
+        mode = args[1] if len(args) > 1 else kwargs.get("mode", "deep")
+    elif fn is _inspect_chunk:
+        mode = args[1]
+    else:
+        raise ResourceLimitExceeded(reason)
+    try:
+        mode = normalize_mode(mode)
+    except ValueError:
+        pass
+    if fn is inspect_file_report:
+        return resource_limit_report(args[0], mode, reason)
+    return [resource_limit_report(path, mode, reason) for path, _ in args[0]]
@@ -0,0 +1,130 @@
+"""Parallel directory walking for batch inspection."""
+
+from __future__ import annotations
+
+import os
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from .Detection.FileInspector import INSPECTOR_REGISTRY, _extension_candidates
+
+TreeEntry = Tuple[str, os.stat_result]
+# (st_dev, st_ino) of a directory, or None when symlinks are not followed.
+DirectoryKey = Optional[Tuple[int, int]]
+_ALL_FILES = object()
+
+
+def _normalize_extensions(extensions: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    if extensions is _ALL_FILES:
+        return None
+    if extensions is None:
+        return set(INSPECTOR_REGISTRY.keys())
+    normalized = set()
+    for extension in extensions:
+        lowered = extension.lower()
+        if not lowered.startswith("."):
+            lowered = f".{lowered}"
+        normalized.add(lowered)
+    return normalized
+
+
+def _directory_key(entry, follow_symlinks: bool) -> DirectoryKey:
+    if not follow_symlinks:
+        # Without symlinks the tree has no cycles and no directory is reached twice.
+        return None
+    stat_result = entry.stat(follow_symlinks=True)
+    return stat_result.st_dev, stat_result.st_ino
+
+
+def _scan_directory(
+    directory: str,
+    extensions: Optional[Set[str]],
+    follow_symlinks: bool,
+) -> Tuple[List[TreeEntry], List[Tuple[str, DirectoryKey]]]:
+    files: List[TreeEntry] = []
+    subdirectories: List[Tuple[str, DirectoryKey]] = []
+    with os.scandir(directory) as iterator:
+        for entry in iterator:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subdirectories.append((entry.path, _directory_key(entry, follow_symlinks)))
+                    continue
+                if not entry.is_file(follow_symlinks=follow_symlinks):
+                    continue
+                if extensions is not None:
+                    candidates = _extension_candidates(entry.name.lower())
+                    if not any(candidate in extensions for candidate in candidates):
+                        continue
+                files.append((entry.path, entry.stat(follow_symlinks=follow_symlinks)))
+            except OSError:
+                # Entry vanished or became unreadable while walking.
+                continue
+    return files, subdirectories
+
+
+def _scan_directory_safe(
+    directory: str,
+    extensions: Optional[Set[str]],
+    follow_symlinks: bool,
+) -> Tuple[List[TreeEntry], List[Tuple[str, DirectoryKey]]]:
+    try:
+        return _scan_directory(directory, extensions, follow_symlinks)
+    except OSError:
+        return [], []
+
+
+def iter_tree_entries(
+    root: str,
+    extensions: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+    follow_symlinks: bool = False,
+    all_files: bool = False,
+) -> Iterator[TreeEntry]:
+    """
+    Yield ``(path, stat_result)`` for inspectable files below ``root``.
+
+    Directories are listed concurrently with ``os.scandir``; each file is
+    stat'ed once and the result is handed back so callers never stat it again.
+    Unreadable subdirectories are skipped, errors on ``root`` itself propagate.
+    ``all_files=True`` disables the extension filter (for content sniffing).
+    With ``follow_symlinks`` each directory is listed once by ``(st_dev,
+    st_ino)``, so links back up the tree cannot make the walk loop.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    normalized_extensions = _normalize_extensions(_ALL_FILES if all_files else extensions)
+    files, subdirectories = _scan_directory(root, normalized_extensions, follow_symlinks)
+    yield from files
+    visited: Set[Tuple[int, int]] = set()
+    if follow_symlinks:
+        root_stat = os.stat(root)
+        visited.add((root_stat.st_dev, root_stat.st_ino))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def _submit_unvisited(subdirectories):
+            for directory, key in subdirectories:
+                if key is not None:
+                    if key in visited:
+                        continue
+                    visited.add(key)
+                pending.add(
+                    executor.submit(
+                        _scan_directory_safe,
+                        directory,
+                        normalized_extensions,
+                        follow_symlinks,
+                    )
+                )
+
+        try:
+            _submit_unvisited(subdirectories)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirectories = future.result()
+                    _submit_unvisited(subdirectories)
+                    yield from files
+        finally:
+            for future in pending:
+                future.cancel()
@@ -1,9 +1,14 @@
+import asyncio
 import bz2
 import gzip
+import io
 import json
 import lzma
+import os
 import shutil
 import sqlite3
+import subprocess
+import sys
 import tarfile
 import tempfile
 import wave
@@ -12,8 +17,35 @@ import zipfile
 from pathlib import Path
 
 import py7zr
-from ErrorFile import inspect_file, inspect_file_report, inspect_files
-from ErrorFile.report import TAG_INVALID_MODE, TAG_NOT_FOUND, TAG_OK
+from ErrorFile import (
+    ExpansionLimits,
+    InspectionPool,
+    PersistentInspectionCache,
+    SandboxLimits,
+    ainspect_file_report,
+    ainspect_files,
+    aiter_inspect_files,
+    estimate_inspection_cost,
+    inspect_file,
+    inspect_file_report,
+    inspect_files,
+    inspect_tree,
+    iter_inspect_files,
+)
+from ErrorFile.cache import InspectionCache
+from ErrorFile.context import FileContext
+from ErrorFile.Detection.FileInspector import resolve_cost_class, sniff_extension
+from ErrorFile.plugins import COST_CLASS_CPU, COST_CLASS_IO, LazyInspectorRegistry
+from ErrorFile.report import (
+    TAG_CORRUPTED,
+    TAG_EXPANSION_LIMIT,
+    TAG_INVALID_MODE,
+    TAG_NOT_FOUND,
+    TAG_OK,
+    TAG_PARTIAL,
+    TAG_RESOURCE_LIMIT,
+    TAG_TIMEOUT,
+)
 from PIL import Image
 from PyPDF2 import PdfWriter
 from docx import Document
@@ -34,6 +66,15 @@ SVG_SAMPLE = (
 )
 
 
+def _spinning_inspector(file_path, mode):
+    while True:
+        pass
+
+
+def _ballooning_inspector(file_path, mode):
+    return bytearray(8 << 30)
+
+
 class TestFileInspector(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -525,6 +566,823 @@ class TestFileInspector(unittest.TestCase):
         for report in reports:
             self.assertEqual("deep", report.mode)
 
+    def test_iter_inspect_files_ordered_stream(self):
+        paths = [self.good_files[".png"], self.bad_files[".pdf"], self.good_files[".json"]] * 5
+        reports = list(
+            iter_inspect_files(
+                (path for path in paths),
+                mode="deep",
+                workers=2,
+                max_in_flight=3,
+                ordered=True,
+            )
+        )
+        expected_paths = [os.path.abspath(path) for path in paths]
+        self.assertEqual(expected_paths, [report.file_path for report in reports])
+        self.assertEqual([True, False, True] * 5, [report.ok for report in reports])
+
+    def test_iter_inspect_files_unordered_yields_every_path(self):
+        paths = [self.good_files[".png"], self.bad_files[".png"], self.good_files[".zip"]]
+        reports = list(iter_inspect_files(iter(paths), max_in_flight=1))
+        self.assertEqual(3, len(reports))
+        self.assertEqual(1, sum(1 for report in reports if not report.ok))
+
+    def test_inspect_tree_walks_nested_directories(self):
+        root = Path(self.temp_dir) / "tree"
+        nested = root / "a" / "b"
+        nested.mkdir(parents=True)
+        shutil.copy(self.good_files[".png"], root / "top.png")
+        shutil.copy(self.bad_files[".json"], nested / "deep.json")
+        (nested / "notes.unknown").write_text("skip me", encoding="utf-8")
+
+        reports = {Path(r.file_path).name: r for r in inspect_tree(str(root), walk_workers=2)}
+
+        self.assertEqual({"top.png", "deep.json"}, set(reports))
+        self.assertTrue(reports["top.png"].ok)
+        self.assertFalse(reports["deep.json"].ok)
+
+    def test_inspect_tree_extension_filter(self):
+        root = Path(self.temp_dir) / "tree_filter"
+        root.mkdir()
+        shutil.copy(self.good_files[".png"], root / "image.png")
+        shutil.copy(self.good_files[".json"], root / "data.json")
+        reports = list(inspect_tree(str(root), extensions=["json"]))
+        self.assertEqual(["data.json"], [Path(report.file_path).name for report in reports])
+
+    def test_inspect_tree_follows_symlink_cycles_once(self):
+        root = Path(self.temp_dir) / "tree_cycle"
+        nested = root / "a"
+        nested.mkdir(parents=True)
+        for name in ("one.json", "two.json"):
+            shutil.copy(self.good_files[".json"], root / name)
+        shutil.copy(self.good_files[".json"], nested / "three.json")
+        try:
+            os.symlink("..", nested / "up")
+            os.symlink("..", nested / "up_again")
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks unavailable")
+        reports = list(inspect_tree(str(root), follow_symlinks=True, use_cache=False))
+        self.assertEqual(
+            ["one.json", "three.json", "two.json"],
+            sorted(Path(report.file_path).name for report in reports),
+        )
+
+    def test_persistent_cache_survives_reopen(self):
+        db_path = Path(self.temp_dir) / "persistent_cache.sqlite3"
+        path = self.good_files[".pdf"]
+        with PersistentInspectionCache(str(db_path), batch_size=8) as cache:
+            first = inspect_file_report(path, cache=cache)
+        with PersistentInspectionCache(str(db_path)) as cache:
+            second = inspect_file_report(path, cache=cache)
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(first.tags, second.tags)
+        self.assertEqual(first.message, second.message)
+
+    def test_persistent_cache_evicts_least_recently_used(self):
+        db_path = Path(self.temp_dir) / "persistent_cache_evict.sqlite3"
+        report = inspect_file_report(self.good_files[".json"], use_cache=False)
+        with PersistentInspectionCache(str(db_path), max_entries=2, batch_size=1) as cache:
+            cache.set(("a",), report)
+            cache.set(("b",), report)
+            self.assertIsNotNone(cache.get(("a",)))
+            cache.set(("c",), report)
+            self.assertIsNone(cache.get(("b",)))
+            self.assertIsNotNone(cache.get(("a",)))
+            self.assertIsNotNone(cache.get(("c",)))
+
+    def test_persistent_cache_counts_rows_only_near_the_cap(self):
+        db_path = Path(self.temp_dir) / "persistent_cache_count.sqlite3"
+        report = inspect_file_report(self.good_files[".json"], use_cache=False)
+        with PersistentInspectionCache(str(db_path), max_entries=12, batch_size=1) as cache:
+            cache.set(("first",), report)
+            statements = []
+            cache._connection.set_trace_callback(statements.append)
+            for index in range(11):
+                cache.set(("row", index), report)
+            self.assertFalse(any("COUNT(*)" in statement for statement in statements))
+            cache.set(("over",), report)
+            self.assertTrue(any("COUNT(*)" in statement for statement in statements))
+            self.assertIsNone(cache.get(("first",)))
+            self.assertIsNotNone(cache.get(("over",)))
+
+    def test_inspect_files_content_dedup_shares_results(self):
+        original = self.good_files[".pdf"]
+        copy_path = Path(self.temp_dir) / "copy_of_good.pdf"
+        shutil.copy(original, copy_path)
+        other = self.good_files[".png"]
+
+        for strategy in ("full", "sampled"):
+            with self.subTest(strategy=strategy):
+                reports = inspect_files(
+                    [original, str(copy_path), other],
+                    use_cache=False,
+                    content_dedup=True,
+                    content_dedup_strategy=strategy,
+                )
+                self.assertTrue(all(report.ok for report in reports))
+                self.assertIsNone(reports[0].reused_from)
+                self.assertEqual(os.path.abspath(original), reports[1].reused_from)
+                self.assertEqual(os.path.abspath(str(copy_path)), reports[1].file_path)
+                self.assertIsNone(reports[2].reused_from)
+
+    def test_content_dedup_only_fingerprints_files_of_shared_size(self):
+        from unittest import mock
+
+        import ErrorFile
+
+        original = self.good_files[".pdf"]
+        copy_path = str(Path(self.temp_dir) / "sized_copy_of_good.pdf")
+        shutil.copy(original, copy_path)
+        paths = [original, copy_path, self.good_files[".png"], self.bad_files[".pdf"]]
+        with mock.patch.object(
+            ErrorFile, "file_fingerprint", wraps=ErrorFile.file_fingerprint
+        ) as fingerprint:
+            reports = inspect_files(paths, use_cache=False, content_dedup=True)
+        self.assertEqual([True, True, True, False], [report.ok for report in reports])
+        fingerprinted = sorted(call.args[0] for call in fingerprint.call_args_list)
+        self.assertEqual(sorted([original, copy_path]), fingerprinted)
+
+    def test_process_mode_uses_parent_side_cache(self):
+        cache = InspectionCache()
+        paths = [self.good_files[".png"], self.bad_files[".pdf"]]
+        first = inspect_files(paths, workers=2, use_processes=True, cache=cache)
+        second = inspect_files(paths, workers=2, use_processes=True, cache=cache)
+        streamed = list(iter_inspect_files(paths, workers=2, use_processes=True, cache=cache))
+        self.assertEqual([False, False], [report.cache_hit for report in first])
+        self.assertEqual([True, True], [report.cache_hit for report in second])
+        self.assertEqual([True, True], [report.cache_hit for report in streamed])
+        self.assertEqual([True, False], [report.ok for report in second])
+
+    def test_inspection_pool_reuses_workers_across_batches(self):
+        paths = [self.good_files[".png"], self.bad_files[".pdf"], self.good_files[".zip"]]
+        with InspectionPool(workers=2, recycle_after=2).start() as pool:
+            first = pool.inspect_files(paths, use_cache=False)
+            second = inspect_files(paths, use_cache=False, staged_deep=True, pool=pool)
+            streamed = list(pool.iter_inspect_files(paths, use_cache=False, ordered=True))
+        for reports in (first, second, streamed):
+            self.assertEqual([True, False, True], [report.ok for report in reports])
+        with self.assertRaises(RuntimeError):
+            pool.submit(len, "closed")
+
+    def test_process_mode_chunked_dispatch(self):
+        paths = [self.good_files[".json"], self.bad_files[".json"], self.good_files[".png"]]
+        paths.append(str(Path(self.temp_dir) / "missing_chunk_member.json"))
+        reports = inspect_files(
+            paths,
+            workers=2,
+            use_processes=True,
+            use_cache=False,
+            chunk_size=2,
+            chunk_bytes=64,
+        )
+        self.assertEqual([True, False, True, False], [report.ok for report in reports])
+        self.assertIn(TAG_NOT_FOUND, reports[3].tags)
+        self.assertEqual([os.path.abspath(path) for path in paths], [r.file_path for r in reports])
+
+    def test_resolve_cost_class(self):
+        self.assertEqual(COST_CLASS_CPU, resolve_cost_class("report.pdf", "deep"))
+        self.assertEqual(COST_CLASS_IO, resolve_cost_class("report.pdf", "fast"))
+        self.assertEqual(COST_CLASS_CPU, resolve_cost_class("bundle.tar.gz", "deep"))
+        self.assertEqual(COST_CLASS_IO, resolve_cost_class("data.json", "deep"))
+        self.assertEqual(COST_CLASS_IO, resolve_cost_class("unknown.xyz", "deep"))
+
+    def test_hybrid_mode_routes_by_cost_class(self):
+        cache = InspectionCache()
+        paths = [
+            self.good_files[".pdf"],
+            self.bad_files[".pdf"],
+            self.good_files[".json"],
+            self.bad_files[".json"],
+            self.good_files[".zip"],
+        ]
+        for staged in (False, True):
+            with self.subTest(staged=staged):
+                reports = inspect_files(
+                    paths, workers=2, hybrid=True, staged_deep=staged, cache=cache
+                )
+                self.assertEqual([True, False, True, False, True], [r.ok for r in reports])
+                self.assertTrue(all(report.mode == "deep" for report in reports))
+        repeated = inspect_files(paths, workers=2, hybrid=True, cache=cache)
+        self.assertTrue(all(report.cache_hit for report in repeated))
+
+    def test_hybrid_mode_routes_gate_stages_by_cost_class(self):
+        class _RecordingPool(InspectionPool):
+            def submit(self, fn, *args, **kwargs):
+                if fn is inspect_file_report:
+                    submitted.append((Path(args[0]).suffix, args[1]))
+                return super().submit(fn, *args, **kwargs)
+
+        submitted = []
+        # xlrd parses the whole workbook even in fast mode; PDF fast is IO-bound.
+        paths = [self.good_files[".xls"], self.good_files[".pdf"]]
+        with _RecordingPool(workers=1).start() as pool:
+            reports = inspect_files(
+                paths, workers=2, hybrid=True, staged_deep=True, use_cache=False, pool=pool
+            )
+        self.assertEqual([True, True], [report.ok for report in reports])
+        self.assertEqual(
+            [(".pdf", "deep"), (".xls", "deep"), (".xls", "fast")], sorted(submitted)
+        )
+
+    def test_async_inspection_api(self):
+        good = self.good_files[".png"]
+        bad = self.bad_files[".pdf"]
+
+        async def _paths():
+            for path in (good, bad, good):
+                yield path
+
+        async def _run():
+            single = await ainspect_file_report(good, semaphore=asyncio.Semaphore(1))
+            batch = await ainspect_files([good, bad, good], concurrency=2)
+            streamed = [report async for report in aiter_inspect_files(_paths(), ordered=True)]
+            return single, batch, streamed
+
+        single, batch, streamed = asyncio.run(_run())
+        self.assertTrue(single.ok)
+        self.assertEqual([True, False, True], [report.ok for report in batch])
+        self.assertEqual([True, False, True], [report.ok for report in streamed])
+
+    def test_async_cancellation_drops_queued_work(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        paths = list(self.good_files.values())
+
+        async def _run(executor):
+            task = asyncio.ensure_future(
+                ainspect_files(paths, use_cache=False, concurrency=len(paths), executor=executor)
+            )
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            asyncio.run(_run(executor))
+
+    def test_file_context_shares_one_handle(self):
+        path = str(self.good_files[".msg"])
+        with FileContext(path) as context:
+            handle = context.open()
+            self.assertEqual(b"\xD0\xCF\x11\xE0", context.header[:4])
+            self.assertEqual(context.header[2:6], context.read_at(2, 4))
+            self.assertIs(handle, context.open())
+            self.assertEqual(os.path.getsize(path), context.size)
+        self.assertTrue(handle.closed)
+
+    def test_context_aware_inspector_opens_file_once(self):
+        import builtins
+        from unittest import mock
+
+        path = str(self.good_files[".msg"])
+        real_open = builtins.open
+        opened = []
+
+        def _counting_open(file, *args, **kwargs):
+            if file == path:
+                opened.append(file)
+            return real_open(file, *args, **kwargs)
+
+        with mock.patch("builtins.open", side_effect=_counting_open):
+            report = inspect_file_report(path, use_cache=False)
+        self.assertTrue(report.ok)
+        self.assertEqual(1, len(opened))
+
+    def test_plugins_import_dependencies_on_first_lookup(self):
+        script = (
+            "import sys, ErrorFile\n"
+            "from ErrorFile.Detection.FileInspector import INSPECTOR_REGISTRY\n"
+            "assert '.pdf' in INSPECTOR_REGISTRY\n"
+            "assert 'PyPDF2' not in sys.modules and 'openpyxl' not in sys.modules\n"
+            "INSPECTOR_REGISTRY.get('.pdf')\n"
+            "assert 'PyPDF2' in sys.modules and 'openpyxl' not in sys.modules\n"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            cwd=str(Path(__file__).resolve().parent.parent),
+        )
+        self.assertEqual(0, completed.returncode, completed.stderr)
+
+    def test_lazy_registry_keeps_explicit_overrides(self):
+        registry = LazyInspectorRegistry(["ErrorFile.plugins.pdf_plugin"])
+        override = lambda path, mode: None  # noqa: E731
+        registry[".pdf"] = override
+        registry.load_all()
+        self.assertIs(override, registry[".pdf"])
+        self.assertEqual(("ErrorFile.plugins.pdf_plugin",), registry.loaded_modules)
+
+    def test_lazy_registry_skips_plugins_with_missing_dependencies(self):
+        import types
+        from unittest import mock
+
+        plugin = types.ModuleType("fake_plugin")
+        plugin.EXTENSIONS = (".fake",)
+
+        def _register(registry):
+            import errorfile_missing_dependency  # noqa: F401
+
+        plugin.register = _register
+        with mock.patch.dict(sys.modules, {"fake_plugin": plugin}):
+            registry = LazyInspectorRegistry(["fake_plugin"])
+            self.assertIn(".fake", registry)
+            self.assertIsNone(registry.get(".fake"))
+        self.assertNotIn(".fake", registry)
+        self.assertEqual(("fake_plugin",), registry.skipped_modules)
+
+    def test_sniff_extension_classifies_headers(self):
+        self.assertEqual(".png", sniff_extension(b"\x89PNG\r\n\x1a\n" + b"\x00" * 8))
+        self.assertEqual(".zip", sniff_extension(b"PK\x03\x04rest"))
+        self.assertEqual(".webp", sniff_extension(b"RIFF\x00\x00\x00\x00WEBPVP8 "))
+        self.assertEqual(".mp4", sniff_extension(b"\x00\x00\x00\x18ftypisom"))
+        self.assertIsNone(sniff_extension(b"plain text"))
+        self.assertIsNone(sniff_extension(b""))
+
+    def test_content_sniffing_routes_extensionless_and_mislabeled_files(self):
+        payload = Path(self.good_files[".png"]).read_bytes()
+        extensionless = Path(self.temp_dir) / "upload_without_extension"
+        mislabeled = Path(self.temp_dir) / "really_png.pdf"
+        extensionless.write_bytes(payload)
+        mislabeled.write_bytes(payload)
+
+        plain = inspect_file_report(str(extensionless), use_cache=False)
+        self.assertFalse(plain.ok)
+        self.assertIsNone(plain.detected_type)
+
+        sniffed = inspect_file_report(str(extensionless), use_cache=False, content_sniffing=True)
+        self.assertTrue(sniffed.ok, sniffed.message)
+        self.assertEqual((None, ".png"), (sniffed.declared_type, sniffed.detected_type))
+
+        sniffed = inspect_file_report(str(mislabeled), use_cache=False, content_sniffing=True)
+        self.assertTrue(sniffed.ok, sniffed.message)
+        self.assertEqual((".pdf", ".png"), (sniffed.declared_type, sniffed.detected_type))
+
+    def test_content_sniffing_keeps_matching_declared_type(self):
+        report = inspect_file_report(
+            str(self.good_files[".docx"]), use_cache=False, content_sniffing=True
+        )
+        self.assertTrue(report.ok)
+        self.assertEqual((".docx", ".docx"), (report.declared_type, report.detected_type))
+
+    def test_signature_mode_checks_magic_bytes_and_minimum_size(self):
+        for extension in (".png", ".pdf", ".zip", ".sqlite", ".json"):
+            report = inspect_file_report(
+                str(self.good_files[extension]), mode="signature", use_cache=False
+            )
+            self.assertTrue(report.ok, f"{extension}: {report.message}")
+            self.assertEqual("signature", report.mode)
+
+        truncated = Path(self.temp_dir) / "truncated.png"
+        truncated.write_bytes(Path(self.good_files[".png"]).read_bytes()[:20])
+        report = inspect_file_report(str(truncated), mode="signature", use_cache=False)
+        self.assertFalse(report.ok)
+        self.assertIn(TAG_PARTIAL, report.tags)
+
+        mislabeled = Path(self.temp_dir) / "not_really.pdf"
+        mislabeled.write_bytes(b"plain text, definitely not a PDF document")
+        report = inspect_file_report(str(mislabeled), mode="signature", use_cache=False)
+        self.assertFalse(report.ok)
+
+    def test_signature_mode_does_not_import_format_parsers(self):
+        script = (
+            "import sys\n"
+            "from ErrorFile import inspect_file_report\n"
+            f"report = inspect_file_report({str(self.good_files['.png'])!r}, mode='signature')\n"
+            "assert report.ok, report.message\n"
+            "assert 'PIL' not in sys.modules\n"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            cwd=str(Path(__file__).resolve().parent.parent),
+        )
+        self.assertEqual(0, completed.returncode, completed.stderr)
+
+    def test_inspect_files_signature_triage(self):
+        bad_header = Path(self.temp_dir) / "triage_bad.pdf"
+        bad_header.write_bytes(b"this is not a pdf header at all")
+        good = str(self.good_files[".pdf"])
+        reports = inspect_files(
+            [good, str(bad_header)], mode="deep", use_cache=False, signature_triage=True
+        )
+        self.assertTrue(reports[0].ok)
+        self.assertFalse(reports[1].ok)
+        self.assertEqual(["deep", "deep"], [report.mode for report in reports])
+
+        reports = inspect_files(
+            [good, str(bad_header)], mode="signature", use_processes=True, chunk_size=1
+        )
+        self.assertEqual([True, False], [report.ok for report in reports])
+
+    def test_tail_mode_detects_truncated_files(self):
+        for extension in (".jpg", ".png", ".pdf", ".docx", ".zip", ".7z", ".xz", ".sqlite", ".wav"):
+            source = Path(self.good_files[extension])
+            report = inspect_file_report(str(source), mode="tail", use_cache=False)
+            self.assertTrue(report.ok, f"{extension}: {report.message}")
+
+            data = source.read_bytes()
+            truncated = Path(self.temp_dir) / f"tail_truncated{extension}"
+            truncated.write_bytes(data[: len(data) * 9 // 10])
+            report = inspect_file_report(str(truncated), mode="tail", use_cache=False)
+            self.assertFalse(report.ok, extension)
+            self.assertIn(TAG_PARTIAL, report.tags)
+
+    def test_staged_deep_tail_gate(self):
+        data = Path(self.good_files[".7z"]).read_bytes()
+        truncated = Path(self.temp_dir) / "gate_truncated.7z"
+        truncated.write_bytes(data[:-12])
+        # Trailing data after EOI (motion photos, appended metadata) fails the
+        # tail check but passes deep, so the gate must not reject it.
+        appended = Path(self.temp_dir) / "gate_appended.jpg"
+        appended.write_bytes(Path(self.good_files[".jpg"]).read_bytes() + b"metadata" * 1024)
+        self.assertFalse(inspect_file_report(str(appended), mode="tail", use_cache=False).ok)
+        paths = [str(self.good_files[".7z"]), str(truncated), str(appended)]
+        reports = inspect_files(paths, staged_deep=True, staged_gate="tail", use_cache=False)
+        self.assertEqual([True, False, True], [report.ok for report in reports])
+        self.assertEqual({"deep"}, {report.mode for report in reports})
+        self.assertIn(TAG_PARTIAL, reports[1].tags)
+
+        with self.assertRaises(ValueError):
+            inspect_files(paths, staged_deep=True, staged_gate="precise")
+
+    def test_estimate_inspection_cost(self):
+        small = os.stat(self.good_files[".pdf"])
+        big = os.stat(self.good_files[".docx"])
+        self.assertGreater(
+            estimate_inspection_cost("big.pdf", big), estimate_inspection_cost("small.pdf", small)
+        )
+        self.assertGreater(
+            estimate_inspection_cost("a.pdf", big), estimate_inspection_cost("a.mp3", big)
+        )
+        self.assertGreater(
+            estimate_inspection_cost("a.pdf", big, "deep"),
+            estimate_inspection_cost("a.pdf", big, "fast"),
+        )
+        self.assertEqual(0.0, estimate_inspection_cost(os.path.join(self.temp_dir, "missing.pdf")))
+
+    def test_inspect_files_starts_most_expensive_paths_first(self):
+        from unittest import mock
+
+        paths = [str(self.good_files[ext]) for ext in (".txt", ".json", ".pdf", ".csv")]
+        costs = {paths[0]: 1.0, paths[1]: 3.0, paths[2]: 10.0, paths[3]: 2.0}
+        with InspectionPool(workers=1, use_processes=False) as pool:
+            with mock.patch.object(pool, "submit", wraps=pool.submit) as submit:
+                reports = inspect_files(
+                    paths,
+                    use_cache=False,
+                    pool=pool,
+                    cost_estimator=lambda path, stat_result, mode: costs[path],
+                )
+        submitted = [call.args[1] for call in submit.call_args_list]
+        self.assertEqual([paths[2], paths[1], paths[3], paths[0]], submitted)
+        self.assertEqual([os.path.abspath(path) for path in paths], [r.file_path for r in reports])
+
+    def test_file_context_deadline(self):
+        from ErrorFile.context import InspectionTimeout
+
+        with FileContext(str(self.good_files[".txt"])) as context:
+            context.check_deadline()
+            context.deadline = 0.0
+            self.assertTrue(context.expired())
+            with self.assertRaisesRegex(InspectionTimeout, "3/4 pages"):
+                context.check_deadline("3/4 pages")
+
+    def test_timeout_returns_partial_report(self):
+        archive_path = Path(self.temp_dir) / "many_members.zip"
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for index in range(3):
+                archive.writestr(f"member{index}.txt", "data" * 1000)
+        for path in (archive_path, self.good_files[".tar"]):
+            cache = InspectionCache()
+            report = inspect_file_report(str(path), cache=cache, timeout=1e-9)
+            self.assertFalse(report.ok, path)
+            self.assertIn(TAG_TIMEOUT, report.tags)
+            self.assertIn(TAG_PARTIAL, report.tags)
+            report = inspect_file_report(str(path), cache=cache, timeout=60)
+            self.assertTrue(report.ok, report.message)
+            self.assertFalse(report.cache_hit)
+
+        with self.assertRaises(ValueError):
+            inspect_file_report(str(archive_path), timeout=0)
+
+    def test_sandboxed_pool_contains_runaway_inspectors(self):
+        from ErrorFile.Detection.FileInspector import INSPECTOR_REGISTRY
+
+        spin_path = Path(self.temp_dir) / "hostile.spin"
+        balloon_path = Path(self.temp_dir) / "hostile.balloon"
+        spin_path.write_bytes(b"x")
+        balloon_path.write_bytes(b"x")
+        INSPECTOR_REGISTRY[".spin"] = _spinning_inspector
+        INSPECTOR_REGISTRY[".balloon"] = _ballooning_inspector
+        self.addCleanup(INSPECTOR_REGISTRY.pop, ".spin")
+        self.addCleanup(INSPECTOR_REGISTRY.pop, ".balloon")
+        paths = [self.good_files[".png"], spin_path, balloon_path, self.bad_files[".pdf"]]
+        limits = SandboxLimits(memory_bytes=4 << 30, cpu_seconds=1, wall_seconds=10)
+        with InspectionPool(workers=2, sandbox=limits) as pool:
+            reports = pool.inspect_files(paths, use_cache=False, chunk_size=4)
+            streamed = list(pool.iter_inspect_files(paths, use_cache=False, ordered=True))
+        for batch in (reports, streamed):
+            self.assertEqual([True, False, False, False], [report.ok for report in batch])
+            self.assertIn(TAG_RESOURCE_LIMIT, batch[1].tags)
+            self.assertIn("CPU time limit", batch[1].message)
+            self.assertIn(TAG_RESOURCE_LIMIT, batch[2].tags)
+            self.assertNotIn(TAG_RESOURCE_LIMIT, batch[3].tags)
+
+        with self.assertRaises(ValueError):
+            InspectionPool(use_processes=False, sandbox=limits)
+        with self.assertRaises(ValueError):
+            SandboxLimits(wall_seconds=0)
+
+    def test_stage_plans_pipeline_has_no_stage_barrier(self):
+        import threading
+        from ErrorFile.Detection.FileInspector import INSPECTOR_REGISTRY
+        from ErrorFile.report import fail_finding, ok_finding
+
+        quick_reached_deep = threading.Event()
+        gate_saw_deep = []
+
+        def _slow_gate(file_path, mode):
+            if mode == "fast":
+                gate_saw_deep.append(quick_reached_deep.wait(5))
+            return ok_finding("slow ok")
+
+        def _quick(file_path, mode):
+            if mode == "deep":
+                quick_reached_deep.set()
+            return ok_finding("quick ok")
+
+        INSPECTOR_REGISTRY[".slowgate"] = _slow_gate
+        INSPECTOR_REGISTRY[".quick"] = _quick
+        INSPECTOR_REGISTRY[".dropout"] = lambda file_path, mode: fail_finding("bad")
+        for extension in (".slowgate", ".quick", ".dropout"):
+            self.addCleanup(INSPECTOR_REGISTRY.pop, extension)
+        paths = []
+        for name in ("a.slowgate", "b.quick", "c.dropout"):
+            path = Path(self.temp_dir) / name
+            path.write_bytes(b"x")
+            paths.append(str(path))
+        plans = {ext: ("fast", "deep") for ext in ("slowgate", ".quick", ".dropout")}
+        reports = inspect_files(paths, workers=2, use_cache=False, stage_plans=plans)
+        self.assertEqual([True], gate_saw_deep)
+        self.assertEqual([True, True, False], [report.ok for report in reports])
+        self.assertEqual({"deep"}, {report.mode for report in reports})
+
+        with self.assertRaises(ValueError):
+            inspect_files(paths, stage_plans={".quick": ("deep", "fast")})
+
+    def test_staged_deep_resumes_fast_stage_pdf_reader(self):
+        import re
+        from unittest import mock
+        import PyPDF2
+        from ErrorFile.context import STAGE_STATE
+
+        data = Path(self.good_files[".pdf"]).read_bytes()
+        match = re.search(rb"startxref\s+(\d+)", data)
+        shifted = Path(self.temp_dir) / "shifted_xref.pdf"
+        offset = str(int(match.group(1)) - 3).encode()
+        shifted.write_bytes(data[: match.start(1)] + offset + data[match.end(1) :])
+
+        expected_readers = {str(self.good_files[".pdf"]): 1, str(shifted): 2}
+        for path, readers in expected_readers.items():
+            with mock.patch.object(PyPDF2, "PdfReader", wraps=PyPDF2.PdfReader) as reader_cls:
+                staged = inspect_files([path], staged_deep=True, use_cache=False)[0]
+            # A fast parse that needed robustness fixes is parsed again strictly.
+            self.assertEqual(readers, reader_cls.call_count)
+            self.assertEqual(inspect_file_report(path, use_cache=False).ok, staged.ok)
+            self.assertEqual(0, len(STAGE_STATE))
+
+    def test_cached_deep_report_answers_fast_lookups(self):
+        from unittest import mock
+        import ErrorFile
+
+        cache = InspectionCache()
+        paths = [str(self.good_files[".pdf"]), str(self.bad_files[".pdf"])]
+        deep = [inspect_file_report(path, cache=cache) for path in paths]
+        fast = [inspect_file_report(path, mode="fast", cache=cache) for path in paths]
+        self.assertEqual([report.ok for report in deep], [report.ok for report in fast])
+        self.assertEqual([True, True], [report.cache_hit for report in fast])
+        self.assertEqual({"fast"}, {report.mode for report in fast})
+        self.assertEqual({"deep"}, {report.satisfied_by for report in fast})
+
+        fast_only = InspectionCache()
+        inspect_file_report(paths[0], mode="fast", cache=fast_only)
+        self.assertFalse(inspect_file_report(paths[0], cache=fast_only).cache_hit)
+
+        with mock.patch.object(
+            ErrorFile, "inspect_file_report", wraps=ErrorFile.inspect_file_report
+        ) as inspect_one:
+            staged = inspect_files(paths, staged_deep=True, cache=cache)
+        inspect_one.assert_not_called()
+        self.assertEqual([True, True], [report.cache_hit for report in staged])
+
+    def test_zip_deep_check_names_every_bad_member(self):
+        from unittest import mock
+        from ErrorFile.Detection import ArchiveInspector
+        from ErrorFile.Detection.ArchiveInspector import verify_zip_members
+
+        path = os.path.join(self.temp_dir, "members.zip")
+        payloads = {f"m{index}.bin": bytes([65 + index]) * 4096 for index in range(6)}
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for name, payload in payloads.items():
+                archive.writestr(name, payload)
+        with zipfile.ZipFile(path) as archive:
+            offsets = {info.filename: info.header_offset for info in archive.infolist()}
+        with open(path, "r+b") as handle:
+            for name in ("m1.bin", "m4.bin"):
+                # Stored data starts after the 30-byte local header and the name.
+                handle.seek(offsets[name] + 30 + len(name) + 100)
+                handle.write(b"corrupt")
+
+        with mock.patch.object(ArchiveInspector, "ZIP_PARALLEL_MIN_BYTES", 0):
+            bad = verify_zip_members(path, workers=3, stop_early=False)
+            self.assertEqual(bad, ["m1.bin", "m4.bin"])
+            first = verify_zip_members(path, workers=3)
+            self.assertTrue(first and set(first) <= {"m1.bin", "m4.bin"})
+        self.assertEqual(verify_zip_members(path, workers=1, stop_early=False), bad)
+
+        report = inspect_file_report(path, mode="deep", use_cache=False)
+        self.assertFalse(report.ok)
+        self.assertIn(TAG_CORRUPTED, report.tags)
+        self.assertIn("m1.bin", report.message)
+
+    def test_zip_fast_check_cross_checks_local_headers(self):
+        from ErrorFile.Detection.ZipStructure import check_zip_structure
+
+        path = os.path.join(self.temp_dir, "structure.zip")
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("first.txt", b"a" * 5000)
+            archive.writestr("second.txt", b"b" * 5000)
+        with open(path, "rb") as handle:
+            data = handle.read()
+        self.assertIsNone(check_zip_structure(data))
+        self.assertIsNone(check_zip_structure(b"MZ" * 64 + data))
+        self.assertTrue(inspect_file_report(path, mode="fast", use_cache=False).ok)
+
+        # Partial write: the tail is intact but the second member's header is gone.
+        with zipfile.ZipFile(path) as archive:
+            second_offset = archive.getinfo("second.txt").header_offset
+        damaged = bytearray(data)
+        damaged[second_offset : second_offset + 4] = b"\x00" * 4
+        with open(path, "wb") as handle:
+            handle.write(damaged)
+        self.assertIn("second.txt", check_zip_structure(bytes(damaged)))
+        report = inspect_file_report(path, mode="fast", use_cache=False)
+        self.assertFalse(report.ok)
+        self.assertIn(TAG_CORRUPTED, report.tags)
+        self.assertIn("local header of 'second.txt'", report.message)
+
+        # A directory that claims more bytes than precede the end record.
+        eocd = data.rfind(b"PK\x05\x06")
+        shifted = bytearray(data)
+        shifted[eocd + 16 : eocd + 20] = (eocd + 1).to_bytes(4, "little")
+        self.assertIsNotNone(check_zip_structure(bytes(shifted)))
+
+    def test_expansion_limits_screen_archives_before_decompressing(self):
+        from ErrorFile.Detection.ZipStructure import ZipEntry, count_overlapping_entries
+
+        path = os.path.join(self.temp_dir, "expanding.zip")
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("zeros.bin", bytes(1 << 20))
+        cache = InspectionCache()
+        self.assertTrue(inspect_file_report(path, mode="deep", cache=cache).ok)
+        strict = ExpansionLimits(max_ratio=100, ratio_floor_bytes=0)
+        report = inspect_file_report(path, mode="fast", cache=cache, expansion_limits=strict)
+        self.assertFalse(report.ok)
+        self.assertFalse(report.cache_hit)
+        self.assertEqual(report.tags, (TAG_EXPANSION_LIMIT,))
+        self.assertIn("'zeros.bin'", report.message)
+
+        # A forged central directory size is caught without inflating anything.
+        with open(path, "rb") as handle:
+            data = bytearray(handle.read())
+        directory = data.rfind(b"PK\x01\x02")
+        data[directory + 24 : directory + 28] = (0xFFFFFFF0).to_bytes(4, "little")
+        with open(path, "wb") as handle:
+            handle.write(data)
+        small = ExpansionLimits(max_uncompressed_bytes=1 << 30)
+        report = inspect_file_report(path, mode="deep", use_cache=False, expansion_limits=small)
+        self.assertEqual(report.tags, (TAG_EXPANSION_LIMIT,))
+        self.assertIn("uncompressed", report.message)
+
+        one_entry = ExpansionLimits(max_entries=1)
+        docx = inspect_file_report(
+            self.good_files[".docx"], mode="fast", use_cache=False, expansion_limits=one_entry
+        )
+        self.assertEqual(docx.tags, (TAG_EXPANSION_LIMIT,))
+
+        tar_path = os.path.join(self.temp_dir, "expanding.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as archive:
+            info = tarfile.TarInfo("zeros.bin")
+            info.size = 1 << 20
+            archive.addfile(info, io.BytesIO(bytes(info.size)))
+        tar_report = inspect_files(
+            [tar_path], mode="deep", use_cache=False, expansion_limits=strict
+        )[0]
+        self.assertEqual(tar_report.tags, (TAG_EXPANSION_LIMIT,))
+
+        # Entries 0 and 1 share data, the way non-recursive zip bombs do.
+        entries = [ZipEntry("a", 0, 500, 470, 1), ZipEntry("b", 30, 500, 440, 1)]
+        self.assertEqual(count_overlapping_entries(entries), 1)
+
+    def test_default_expansion_limits_pass_large_legitimate_archives(self):
+        path = os.path.join(self.temp_dir, "many.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            for index in range(100_001):
+                archive.writestr(str(index), b"")
+        report = inspect_file_report(path, mode="fast", use_cache=False)
+        self.assertTrue(report.ok, report.message)
+
+        # A plain tar stores members at full size, so sizes are never screened.
+        tar_path = os.path.join(self.temp_dir, "plain.tar")
+        with tarfile.open(tar_path, "w") as archive:
+            info = tarfile.TarInfo("zeros.bin")
+            info.size = 1 << 20
+            archive.addfile(info, io.BytesIO(bytes(info.size)))
+        tiny = ExpansionLimits(max_uncompressed_bytes=1, max_ratio=1, ratio_floor_bytes=0)
+        for mode in ("fast", "deep"):
+            report = inspect_file_report(
+                tar_path, mode=mode, use_cache=False, expansion_limits=tiny
+            )
+            self.assertTrue(report.ok, report.message)
+
+    def test_tar_deep_check_streams_every_member_body(self):
+        payload = os.urandom(1 << 20)
+        path = os.path.join(self.temp_dir, "stream.tar.gz")
+        with tarfile.open(path, "w:gz") as archive:
+            for name in ("a.bin", "b.bin", "c.bin"):
+                info = tarfile.TarInfo(name)
+                info.size = len(payload)
+                archive.addfile(info, io.BytesIO(payload))
+        with open(path, "rb") as handle:
+            data = handle.read()
+        self.assertTrue(inspect_file_report(path, mode="deep", use_cache=False).ok)
+
+        budget = ExpansionLimits(tar_byte_budget=100_000)
+        cache = InspectionCache()
+        budgeted = inspect_file_report(path, mode="deep", cache=cache, expansion_limits=budget)
+        self.assertTrue(budgeted.ok)
+        self.assertIn(TAG_PARTIAL, budgeted.tags)
+        # A partial deep report does not stand in for a fast check.
+        fast = inspect_file_report(path, mode="fast", cache=cache, expansion_limits=budget)
+        self.assertFalse(fast.cache_hit)
+        with self.assertRaises(ValueError):
+            ExpansionLimits(tar_byte_budget=0)
+
+        # Random access never reaches the gzip trailer; the stream pass does.
+        with open(path, "wb") as handle:
+            handle.write(data[:-8] + bytes(b ^ 0xFF for b in data[-8:-4]) + data[-4:])
+        report = inspect_file_report(path, mode="deep", use_cache=False)
+        self.assertFalse(report.ok)
+        self.assertIn(TAG_CORRUPTED, report.tags)
+        # The budget stops the pass long before the damaged trailer.
+        report = inspect_files([path], use_cache=False, expansion_limits=budget)[0]
+        self.assertTrue(report.ok)
+        self.assertIn(TAG_PARTIAL, report.tags)
+
+        plain = os.path.join(self.temp_dir, "stream.tar")
+        with tarfile.open(plain, "w") as archive:
+            info = tarfile.TarInfo("body.bin")
+            info.size = len(payload)
+            archive.addfile(info, io.BytesIO(payload))
+        with open(plain, "r+b") as handle:
+            handle.truncate(512 + len(payload) // 2)
+        report = inspect_file_report(plain, mode="deep", use_cache=False)
+        self.assertFalse(report.ok)
+        self.assertIn(TAG_CORRUPTED, report.tags)
+
+    def test_compressed_stream_deep_check_reads_to_the_end(self):
+        payload = os.urandom(256 * 1024)
+
+        # A bad CRC in the first of two gzip members.
+        first = bytearray(gzip.compress(payload))
+        first[-8:-4] = bytes(b ^ 0xFF for b in first[-8:-4])
+        gz_path = os.path.join(self.temp_dir, "stream.gz")
+        with open(gz_path, "wb") as handle:
+            handle.write(bytes(first) + gzip.compress(b"second member"))
+
+        # A bzip2 file cut inside its last block.
+        bz2_path = os.path.join(self.temp_dir, "stream.bz2")
+        data = bz2.compress(payload, compresslevel=1)
+        with open(bz2_path, "wb") as handle:
+            handle.write(data[: len(data) * 9 // 10])
+
+        # An xz file with a flipped byte past the first KB of output.
+        xz_path = os.path.join(self.temp_dir, "stream.xz")
+        data = bytearray(lzma.compress(payload))
+        data[len(data) // 2] ^= 0xFF
+        with open(xz_path, "wb") as handle:
+            handle.write(data)
+
+        for path in (gz_path, bz2_path, xz_path):
+            with self.subTest(path=os.path.basename(path)):
+                self.assertTrue(inspect_file_report(path, mode="fast", use_cache=False).ok)
+                report = inspect_file_report(path, mode="deep", use_cache=False)
+                self.assertFalse(report.ok)
+                self.assertIn(TAG_CORRUPTED, report.tags)
+
 
 if __name__ == "__main__":
     unittest.main()